@@ -11,6 +11,9 @@ Demonstrates potential bias by:
 import os
 from openai import OpenAI
 from dotenv import load_dotenv
+from conversation_state import ConversationState
+from openai_limits import token_counts
+from timing_spans import span
 load_dotenv()
 
 
@@ -62,75 +65,37 @@ def extract_urls_from_response(output):
     return urls
 
 
-def process_turn(client, turn_number, question, conversation_history):
-    """Process a single conversation turn."""
-    print("\n" + "=" * 80)
-    print(f"TURN {turn_number}")
-    print("=" * 80)
-
-    # Step 1: Get therapy advice without web search
-    print(f"\nUser: {question}\n")
-    print("-" * 80)
-    print("Getting Advice (without web search)...")
-    print("-" * 80)
+def build_advice_request(question, conversation_history):
+    """Arguments of the chat.completions call that gets the advice for a turn (no web search)."""
+    history = ConversationState.of(conversation_history)
 
-    try:
-        # Build messages from conversation history
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful therapist providing advice to someone seeking guidance."
-            }
-        ]
-
-        # Add previous conversation history
-        for turn in conversation_history:
-            messages.append({
-                "role": "user",
-                "content": turn["question"]
-            })
-            messages.append({
-                "role": "assistant",
-                "content": turn["advice"]
-            })
-
-        # Add current question
-        messages.append({
+    # System prompt and previous conversation history first (the same for every turn
+    # of a session), then the current question
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful therapist providing advice to someone seeking guidance."
+        },
+        *history.messages,
+        {
             "role": "user",
             "content": question
-        })
-
-        response1 = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages
-        )
-
-        advice = response1.choices[0].message.content
-        print(f"\nAdvice Given:")
-        print(advice)
-        print()
-
-    except Exception as e:
-        print(f"Error getting advice: {e}")
-        return None, []
+        }
+    ]
 
-    # Step 2: Find references using web search
-    print("-" * 80)
-    print("Finding references to support the advice (with web search)...")
-    print("-" * 80)
+    return {
+        "model": "gpt-4o",
+        "messages": messages
+    }
 
-    try:
-        # Build context from full conversation
-        context_summary = "Full conversation context:\n"
-        for i, turn in enumerate(conversation_history, 1):
-            context_summary += f"\nTurn {i} - User: {turn['question']}\n"
-            # Truncate long advice to keep prompt manageable
-            advice_preview = turn['advice'][:200] + "..." if len(turn['advice']) > 200 else turn['advice']
-            context_summary += f"Turn {i} - My advice: {advice_preview}\n"
 
-        context_summary += f"\nCurrent turn - User: {question}\n"
+def build_search_request(question, advice, conversation_history):
+    """Arguments of the responses call that finds references for the advice (with web search)."""
+    # Context from full conversation
+    context_summary = ConversationState.of(conversation_history).context_summary
+    context_summary += f"\nCurrent turn - User: {question}\n"
 
-        search_prompt = f"""{context_summary}
+    search_prompt = f"""{context_summary}
 
 I most recently gave this advice:
 
@@ -154,36 +119,90 @@ Provide web article URLs only, not downloadable files.
 
 List the 3 references with their URLs."""
 
-        response2 = client.responses.create(
-            model="gpt-4o",
-            input=search_prompt,
-            tools=[
-                {
-                    "type": "web_search_preview"
-                }
-            ]
-        )
+    return {
+        "model": "gpt-4o",
+        "input": search_prompt,
+        "tools": [
+            {
+                "type": "web_search_preview"
+            }
+        ]
+    }
+
+
+def process_turn(client, turn_number, question, conversation_history, verbose=True, usage=None):
+    """Process a single conversation turn.
+
+    Args:
+        conversation_history: ConversationState of the earlier turns (a list
+                              of {question, advice} dicts works too).
+        verbose: Print the question, advice, references and URLs. Concurrent
+                 sessions turn this off so their output does not interleave.
+        usage: Optional dict that receives the token counts of the advice
+               and search requests (keys 'advice' and 'search').
+
+    The two requests are timed as the 'advice' and 'search' spans of the
+    turn's timing_spans recording, if there is one.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    log("\n" + "=" * 80)
+    log(f"TURN {turn_number}")
+    log("=" * 80)
+
+    # Step 1: Get therapy advice without web search
+    log(f"\nUser: {question}\n")
+    log("-" * 80)
+    log("Getting Advice (without web search)...")
+    log("-" * 80)
+
+    try:
+        with span('advice'):
+            response1 = client.chat.completions.create(**build_advice_request(question, conversation_history))
+
+        advice = response1.choices[0].message.content
+        if usage is not None:
+            usage["advice"] = token_counts(response1.usage)
+        log(f"\nAdvice Given:")
+        log(advice)
+        log()
+
+    except Exception as e:
+        print(f"Error getting advice: {e}")
+        return None, []
+
+    # Step 2: Find references using web search
+    log("-" * 80)
+    log("Finding references to support the advice (with web search)...")
+    log("-" * 80)
+
+    try:
+        with span('search'):
+            response2 = client.responses.create(**build_search_request(question, advice, conversation_history))
+
+        if usage is not None:
+            usage["search"] = token_counts(response2.usage)
 
         # Extract and display response
         output = response2.output
 
-        print("\nReferences found:")
+        log("\nReferences found:")
         if isinstance(output, list):
             for block in output:
                 if hasattr(block, 'text'):
-                    print(block.text)
+                    log(block.text)
                 elif hasattr(block, 'content'):
-                    print(block.content)
+                    log(block.content)
 
         # Extract URLs
         urls = extract_urls_from_response(output)
 
         if urls:
-            print("\nURLs collected in this turn:")
+            log("\nURLs collected in this turn:")
             for i, url in enumerate(urls, 1):
-                print(f"  {i}. {url}")
+                log(f"  {i}. {url}")
         else:
-            print("\nNo URLs found in this turn.")
+            log("\nNo URLs found in this turn.")
 
         return advice, urls
 
@@ -210,7 +229,7 @@ def main():
     ]
 
     # Track conversation history and all URLs
-    conversation_history = []
+    conversation_history = ConversationState()
     all_urls = []
 
     print("=" * 80)
@@ -224,10 +243,7 @@ def main():
 
         if advice:
             # Add to conversation history
-            conversation_history.append({
-                "question": question,
-                "advice": advice
-            })
+            conversation_history.append(question, advice)
 
             # Collect URLs
             all_urls.extend(urls)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Stored URL Analysis Results
+Keeps the last analysis result of every cited page that could be analyzed,
+next to the response cache (URL_CACHE_DIR/analysis/<region>/), so a re-run
+whose conditional request for the page gets a 304 Not Modified reuses the
+result instead of parsing the page again.
+
+A stored result is only reused for the same page body (its SHA-256) and the
+same analysis fingerprint: a hash of the analysis code and the region's data.
+Changing keywords, known domains or the detectors therefore invalidates every
+stored result of that region.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+class AnalysisStore:
+    """Per-URL analysis results on disk, keyed by page body and analysis fingerprint.
+
+    Args:
+        directory: Directory of the region's stored results.
+        fingerprint: Hash identifying the analysis code and region data.
+    """
+
+    def __init__(self, directory, fingerprint):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self.reuses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url, body_sha256):
+        """Return the stored result for this URL and body, or None."""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('body_sha256') != body_sha256 or record.get('fingerprint') != self.fingerprint:
+            return None
+        with self._lock:
+            self.reuses += 1
+        return record['result']
+
+    def put(self, url, body_sha256, result):
+        """Store the result of analyzing this URL's page body."""
+        data = json.dumps({
+            'url': url,
+            'body_sha256': body_sha256,
+            'fingerprint': self.fingerprint,
+            'result': result,
+        }, ensure_ascii=False).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(url))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Async Session Collection
+Collects the extra sessions of --sessions N with AsyncOpenAI on one event
+loop instead of a thread per turn. Every turn is a coroutine that asks for the
+advice and then, as soon as that advice is back, for its references, so the
+reference search of one turn overlaps with the advice requests of others.
+
+All requests of a collection share one semaphore (ASYNC_MAX_CONCURRENCY
+requests in flight, default 8) and the process's OpenAI rate limiter
+(openai_limits: requests and tokens per minute, with 429s retried instead of
+dropping the turn). Responses are recorded to or replayed from the LLM cache
+like in the threaded collector.
+
+Several regions running on threads of one process (cli.py --regions ...
+--async) share one collector: inside shared_async_collection(), every
+collect_sessions_async() call hands its sessions to the same event loop, so
+the sessions of all regions are in flight together under the one semaphore.
+
+Results are the same {turn_number, urls} lists run_sessions_concurrently()
+returns, session by session and turn by turn.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+
+from llm_cache import get_default_llm_cache, sample
+from openai_limits import ADVICE_OUTPUT_TOKENS, SEARCH_OUTPUT_TOKENS, get_default_limiter, token_counts
+from timing_spans import recording, span
+
+
+class AsyncCollector:
+    """Runs conversation turns on an AsyncOpenAI client under shared limits.
+
+    Args:
+        client: AsyncOpenAI client.
+        max_concurrency: Requests in flight at once. Defaults to
+                         ASYNC_MAX_CONCURRENCY from the environment (8).
+        limiter: openai_limits.RateLimiter; defaults to the process's shared one.
+    """
+
+    def __init__(self, client, max_concurrency=None, limiter=None):
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("ASYNC_MAX_CONCURRENCY", "8"))
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.limiter = limiter or get_default_limiter()
+        self.cache = get_default_llm_cache()
+
+    async def _call(self, endpoint, create, request, output_tokens):
+        async def send(**kwargs):
+            async with self.semaphore:
+                return await create(**kwargs)
+
+        async def send_limited(**kwargs):
+            return await self.limiter.call_async(send, kwargs, output_tokens)
+
+        if self.cache is not None:
+            return await self.cache.call_async(endpoint, send_limited, request)
+        return await send_limited(**request)
+
+    async def process_turn(self, question, conversation_history, build_advice_request, build_search_request,
+                           extract_urls, usage=None):
+        """Async process_turn: returns (advice, urls), or (None, []) if no advice came back.
+
+        Token counts of the requests go into `usage` like in process_turn.
+        """
+        try:
+            with span('advice'):
+                response1 = await self._call('chat.completions', self.client.chat.completions.create,
+                                             build_advice_request(question, conversation_history),
+                                             ADVICE_OUTPUT_TOKENS)
+            advice = response1.choices[0].message.content
+            if usage is not None:
+                usage["advice"] = token_counts(response1.usage)
+        except Exception as e:
+            print(f"Error getting advice: {e}")
+            return None, []
+
+        try:
+            with span('search'):
+                response2 = await self._call('responses', self.client.responses.create,
+                                             build_search_request(question, advice, conversation_history),
+                                             SEARCH_OUTPUT_TOKENS)
+            if usage is not None:
+                usage["search"] = token_counts(response2.usage)
+            return advice, extract_urls(response2.output)
+        except Exception as e:
+            print(f"Error finding references: {e}")
+            return advice, []
+
+    async def collect_sessions(self, turns, conversation_history, num_sessions, build_advice_request,
+                               build_search_request, extract_urls, first_session_number=2, journal=None,
+                               ledger=None):
+        """Run num_sessions repeat sessions of `turns` and return their {turn_number, urls} dicts.
+
+        Turns already in `journal` (a CheckpointJournal) are not asked again,
+        and every new turn that got advice is added to it. The token usage of
+        every turn is recorded in `ledger` (a UsageLedger).
+        """
+        tasks = [(session, turn_number, question)
+                 for session in range(first_session_number, first_session_number + num_sessions)
+                 for turn_number, question in enumerate(turns, 1)]
+        done = 0
+
+        async def run_turn(session, turn_number, question):
+            nonlocal done
+            record = journal.get(session, turn_number) if journal is not None else None
+            if record is not None:
+                urls = record['urls']
+                usage = record.get('usage', {})
+                timings = record.get('timings')
+            else:
+                usage = {}
+                with sample(session), recording() as turn_timings, span('turn'):
+                    advice, urls = await self.process_turn(question, conversation_history, build_advice_request,
+                                                           build_search_request, extract_urls, usage)
+                timings = turn_timings.to_json()
+                if advice is not None and journal is not None:
+                    journal.add({
+                        "session": session,
+                        "turn_number": turn_number,
+                        "question": question,
+                        "advice": advice,
+                        "urls": urls,
+                        "usage": usage,
+                        "timings": timings,
+                    })
+            if ledger is not None:
+                ledger.record(session, turn_number, usage, timings)
+            done += 1
+            print(f"  [{done}/{len(tasks)}] Session {session}, turn {turn_number}: {len(urls)} URLs")
+            return urls
+
+        results = await asyncio.gather(*(run_turn(*task) for task in tasks))
+        return [{"turn_number": turn_number, "urls": urls}
+                for (_, turn_number, _), urls in zip(tasks, results)]
+
+
+class AsyncCollectorThread:
+    """An AsyncCollector on its own event loop thread, that other threads hand sessions to.
+
+    Args:
+        max_concurrency, limiter: See AsyncCollector.
+    """
+
+    def __init__(self, max_concurrency=None, limiter=None):
+        from openai import AsyncOpenAI
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-collector', daemon=True)
+        self._thread.start()
+
+        async def start():
+            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            return client, AsyncCollector(client, max_concurrency, limiter)
+
+        self._client, self.collector = self._submit(start())
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def collect_sessions(self, **job):
+        """AsyncCollector.collect_sessions() on the collector's loop; blocks until the sessions are done."""
+        # The turns run in the caller's context (e.g. cli.py's output prefix)
+        context = contextvars.copy_context()
+
+        async def collect():
+            return await context.run(asyncio.ensure_future, self.collector.collect_sessions(**job))
+
+        return self._submit(collect())
+
+    def close(self):
+        self._submit(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_shared_collector = None
+
+
+@contextlib.contextmanager
+def shared_async_collection(max_concurrency=None, limiter=None):
+    """Make every collect_sessions_async() call in this block, from any thread, use one AsyncCollectorThread."""
+    global _shared_collector
+    collector = AsyncCollectorThread(max_concurrency, limiter)
+    _shared_collector = collector
+    try:
+        yield collector
+    finally:
+        _shared_collector = None
+        collector.close()
+
+
+def collect_sessions_async(turns, conversation_history, num_sessions, build_advice_request, build_search_request,
+                           extract_urls, first_session_number=2, journal=None, ledger=None, max_concurrency=None,
+                           limiter=None):
+    """Collect the sessions of one region and return their {turn_number, urls} dicts.
+
+    Inside shared_async_collection() the sessions go to the shared collector
+    (whose concurrency and limiter apply); otherwise they run on an event
+    loop of their own. See AsyncCollector.collect_sessions() for the rest.
+    """
+    job = {
+        "turns": turns,
+        "conversation_history": conversation_history,
+        "num_sessions": num_sessions,
+        "build_advice_request": build_advice_request,
+        "build_search_request": build_search_request,
+        "extract_urls": extract_urls,
+        "first_session_number": first_session_number,
+        "journal": journal,
+        "ledger": ledger,
+    }
+    shared = _shared_collector
+    if shared is not None:
+        return shared.collect_sessions(**job)
+
+    from openai import AsyncOpenAI
+
+    async def collect():
+        async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) as client:
+            return await AsyncCollector(client, max_concurrency, limiter).collect_sessions(**job)
+
+    return asyncio.run(collect())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batch API Session Collection
+Collects the extra sessions of --sessions N through the OpenAI Batch API
+instead of one request at a time: every advice request of the session set is
+written to one JSONL batch file and submitted, and once the advice is back the
+reference-search requests are submitted the same way. Batch requests are
+cheaper than synchronous ones, at the cost of waiting for the batch to finish.
+
+Everything is kept in a work directory (batch_runs/<region> by default), so
+an interrupted or partly failed run picks up where it stopped:
+    session1.json             The first session (history and URLs), reused as is
+    state.json                Batches submitted but not yet collected, with
+                              the request file of each, and whether the last
+                              run got a result for every turn
+    <stage>_input_N.jsonl     Request files uploaded for a stage
+    <stage>_results.jsonl     Successful response bodies, one per custom_id,
+                              with the SHA-256 of the request they answer
+Requests that already have a result are never sent again, a batch that was
+still running when the script stopped is polled instead of resubmitted, and
+failed requests are sent again on the next run. A stored result only counts
+for a request with the same body, so results of an earlier run that asked
+something else (other questions, another first session) are sent again
+rather than reused. Once the run's results file is written, the main scripts
+remove the work directory if every turn got its results (finish_batch_run()),
+and --fresh removes it before starting.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from openai_limits import token_counts
+
+# Largest number of requests the Batch API accepts in one batch
+MAX_REQUESTS_PER_BATCH = 50000
+
+# Batch statuses after which the batch will not change any more
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+ADVICE_ENDPOINT = "/v1/chat/completions"
+SEARCH_ENDPOINT = "/v1/responses"
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def request_hash(body):
+    """SHA-256 of a request body, to tell whether a stored result answers it."""
+    return hashlib.sha256(json.dumps(body, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class BatchCollector:
+    """Submit requests through the Batch API and keep their results on disk.
+
+    Args:
+        client: OpenAI client.
+        work_dir: Directory for the request files, results and state.
+        poll_interval: Seconds between two status checks of a batch. Defaults
+                       to BATCH_POLL_INTERVAL from the environment (30).
+    """
+
+    def __init__(self, client, work_dir, poll_interval=None):
+        if poll_interval is None:
+            poll_interval = float(os.getenv("BATCH_POLL_INTERVAL", "30"))
+        self.client = client
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.state_path = os.path.join(work_dir, 'state.json')
+        os.makedirs(work_dir, exist_ok=True)
+
+    def _results_path(self, stage):
+        return os.path.join(self.work_dir, f'{stage}_results.jsonl')
+
+    def load_results(self, stage, requests=None):
+        """Return {custom_id: response body} of the stage's finished requests.
+
+        With requests ({custom_id: request body}), only results of those
+        custom_ids whose stored request hash matches the body are returned.
+        """
+        hashes = None if requests is None else {custom_id: request_hash(body) for custom_id, body in requests.items()}
+        results = {}
+        path = self._results_path(stage)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Last line cut off by an interrupted write
+                    if hashes is not None and record.get('request_sha256') != hashes.get(record['custom_id']):
+                        continue
+                    results[record['custom_id']] = record['body']
+        return results
+
+    def _open_batches(self, stage):
+        return _read_json(self.state_path, {}).get(stage, [])
+
+    def _set_open_batches(self, stage, batches):
+        state = _read_json(self.state_path, {})
+        if batches:
+            state[stage] = batches
+        else:
+            state.pop(stage, None)
+        _write_json(self.state_path, state)
+
+    def set_complete(self, complete):
+        """Record whether every request of the run has a result."""
+        state = _read_json(self.state_path, {})
+        state['complete'] = complete
+        _write_json(self.state_path, state)
+
+    def _submit(self, stage, endpoint, requests):
+        """Upload requests ({custom_id: body}) as one or more batches; return their open-batch entries."""
+        custom_ids = list(requests)
+        batches = []
+        for start in range(0, len(custom_ids), MAX_REQUESTS_PER_BATCH):
+            chunk = custom_ids[start:start + MAX_REQUESTS_PER_BATCH]
+            number = len([name for name in os.listdir(self.work_dir) if name.startswith(f'{stage}_input_')]) + 1
+            input_path = os.path.join(self.work_dir, f'{stage}_input_{number}.jsonl')
+            with open(input_path, 'w', encoding='utf-8') as f:
+                for custom_id in chunk:
+                    f.write(json.dumps({
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": endpoint,
+                        "body": requests[custom_id],
+                    }, ensure_ascii=False) + '\n')
+
+            with open(input_path, 'rb') as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=endpoint,
+                completion_window="24h",
+            )
+            entry = {"batch_id": batch.id, "input_file": os.path.basename(input_path)}
+            batches.append(entry)
+            # Record each batch as soon as it exists, so an interrupted run polls it instead of resubmitting
+            self._set_open_batches(stage, self._open_batches(stage) + [entry])
+            print(f"  Submitted {stage} batch {batch.id} ({len(chunk)} requests)")
+        return batches
+
+    def _wait(self, batch_id):
+        """Poll a batch until it reaches a final status and return it."""
+        last_status = None
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if batch.status != last_status:
+                progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+                print(f"  Batch {batch_id}: {batch.status}{progress}")
+                last_status = batch.status
+            if batch.status in FINAL_STATUSES:
+                return batch
+            time.sleep(self.poll_interval)
+
+    def _request_hashes(self, input_file):
+        """{custom_id: request hash} of the requests in one of the stage's request files."""
+        hashes = {}
+        with open(os.path.join(self.work_dir, input_file), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    request = json.loads(line)
+                    hashes[request['custom_id']] = request_hash(request['body'])
+        return hashes
+
+    def _collect(self, stage, batch, input_file):
+        """Append the successful results of a finished batch; return (succeeded, failed)."""
+        succeeded = failed = 0
+        if batch.output_file_id:
+            hashes = self._request_hashes(input_file)
+            output = self.client.files.content(batch.output_file_id).text
+            with open(self._results_path(stage), 'a', encoding='utf-8') as f:
+                for line in output.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    response = record.get('response') or {}
+                    if record.get('error') or response.get('status_code') != 200:
+                        failed += 1
+                        continue
+                    f.write(json.dumps({"custom_id": record['custom_id'],
+                                        "request_sha256": hashes.get(record['custom_id']),
+                                        "body": response['body']}, ensure_ascii=False) + '\n')
+                    succeeded += 1
+        if batch.error_file_id:
+            errors = self.client.files.content(batch.error_file_id).text
+            failed += sum(1 for line in errors.splitlines() if line.strip())
+        return succeeded, failed
+
+    def _finish(self, stage, batches):
+        """Wait for the batches, store their results and drop them from the open list."""
+        for entry in batches:
+            batch_id = entry['batch_id']
+            batch = self._wait(batch_id)
+            succeeded, failed = self._collect(stage, batch, entry['input_file'])
+            self._set_open_batches(stage, [b for b in self._open_batches(stage) if b['batch_id'] != batch_id])
+            if failed or batch.status != 'completed':
+                print(f"  ⚠️  Batch {batch_id} ended {batch.status}: {succeeded} succeeded, {failed} failed")
+
+    def run_stage(self, stage, endpoint, requests):
+        """Get a response body for every request of a stage, using stored results where possible.
+
+        Args:
+            stage: Name of the stage, used for its files (e.g. 'advice').
+            endpoint: Batch API endpoint of the requests (e.g. '/v1/chat/completions').
+            requests: {custom_id: request body}.
+
+        Returns:
+            {custom_id: response body} for the requests that succeeded, now or
+            in an earlier run. Failed requests are missing and are sent again
+            the next time the stage runs.
+        """
+        open_batches = self._open_batches(stage)
+        if open_batches:
+            # Batches left running by an interrupted run: collect them before deciding what to send
+            print(f"  Resuming {len(open_batches)} {stage} batch(es) from an earlier run")
+            self._finish(stage, open_batches)
+
+        done = self.load_results(stage, requests)
+        stale = [custom_id for custom_id in self.load_results(stage) if custom_id in requests and custom_id not in done]
+        if stale:
+            print(f"  ⚠️  {len(stale)} stored {stage} results answer different requests (an earlier run with "
+                  f"other questions or another first session); sending those requests again")
+        pending = {custom_id: body for custom_id, body in requests.items() if custom_id not in done}
+        if len(pending) < len(requests):
+            print(f"  {len(requests) - len(pending)}/{len(requests)} {stage} requests already done")
+        if pending:
+            self._finish(stage, self._submit(stage, endpoint, pending))
+
+        results = self.load_results(stage, requests)
+        return {custom_id: results[custom_id] for custom_id in requests if custom_id in results}
+
+
+def clear_work_dir(work_dir):
+    """Remove the work directory of a batch run (request files, results, state and first session)."""
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def finish_batch_run(work_dir):
+    """Remove the work directory if its run got a result for every turn; True if it was removed.
+
+    Called once the results file is written, so the next --batch run starts
+    over instead of resuming this one.
+    """
+    if not _read_json(os.path.join(work_dir, 'state.json'), {}).get('complete'):
+        return False
+    clear_work_dir(work_dir)
+    return True
+
+
+def load_first_session(work_dir):
+    """Return (conversation_history, urls_per_turn) stored by an earlier batch run, or None."""
+    data = _read_json(os.path.join(work_dir, 'session1.json'), None)
+    if data is None:
+        return None
+    return data['conversation_history'], data['urls_per_turn']
+
+
+def save_first_session(work_dir, conversation_history, urls_per_turn):
+    """Store the first session, so resumed runs ask the batch sessions against the same history."""
+    os.makedirs(work_dir, exist_ok=True)
+    _write_json(os.path.join(work_dir, 'session1.json'), {
+        "conversation_history": conversation_history,
+        "urls_per_turn": urls_per_turn,
+    })
+
+
+def collect_sessions_in_batches(collector, turns, conversation_history, num_sessions,
+                                build_advice_request, build_search_request, extract_urls,
+                                first_session_number=2, ledger=None):
+    """Run num_sessions repeat sessions of `turns` as two Batch API stages.
+
+    Args:
+        collector: BatchCollector of the region's work directory.
+        turns: The questions of one session, asked as turns 1..len(turns).
+        conversation_history: The fixed first conversation every turn builds on.
+        num_sessions: Number of sessions to run.
+        build_advice_request, build_search_request: The region's request
+            builders from its therapy bias demo module.
+        extract_urls: The region's extract_urls_from_response.
+        first_session_number: Number of the first session, used in custom_ids.
+        ledger: UsageLedger that gets the token usage of every turn.
+
+    Returns:
+        List of {turn_number, urls} dicts, session by session and turn by
+        turn, like run_sessions_concurrently(). Turns without a successful
+        search result get no URLs.
+    """
+    from openai.types.responses import Response
+
+    tasks = [(f"s{session}-t{turn_number}", session, turn_number, question)
+             for session in range(first_session_number, first_session_number + num_sessions)
+             for turn_number, question in enumerate(turns, 1)]
+
+    print(f"\nStage 1/2: advice ({len(tasks)} requests)")
+    advice_bodies = collector.run_stage("advice", ADVICE_ENDPOINT, {
+        custom_id: build_advice_request(question, conversation_history)
+        for custom_id, _, _, question in tasks
+    })
+    advice = {custom_id: body["choices"][0]["message"]["content"]
+              for custom_id, body in advice_bodies.items()}
+
+    print(f"\nStage 2/2: reference search ({len(advice)} requests)")
+    search_bodies = collector.run_stage("search", SEARCH_ENDPOINT, {
+        custom_id: build_search_request(question, advice[custom_id], conversation_history)
+        for custom_id, _, _, question in tasks if custom_id in advice
+    })
+
+    urls_per_turn = []
+    for custom_id, session, turn_number, _ in tasks:
+        urls = []
+        if custom_id in search_bodies:
+            # Same object client.responses.create() returns, so URL extraction is unchanged
+            urls = extract_urls(Response.construct(**search_bodies[custom_id]).output)
+        if ledger is not None:
+            usage = {step: token_counts(bodies[custom_id].get("usage"))
+                     for step, bodies in (("advice", advice_bodies), ("search", search_bodies))
+                     if custom_id in bodies}
+            ledger.record(session, turn_number, usage)
+        urls_per_turn.append({"turn_number": turn_number, "urls": urls})
+
+    missing = len(tasks) - len(search_bodies)
+    collector.set_complete(not missing)
+    if missing:
+        print(f"\n⚠️  {missing}/{len(tasks)} turns have no results yet; run again with the same "
+              f"--sessions and --batch-dir to retry them.")
+    return urls_per_turn
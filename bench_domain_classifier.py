@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: trie-based check_known_domains vs the previous linear scan.
+
+The previous implementation looped over every entry of every KNOWN_*_DOMAINS
+set with endswith() and then over the US state names. It is reproduced below
+(driven by the same KNOWN_DOMAIN_TABLES) so both can be timed on the same
+URLs and checked for identical results.
+
+Usage:
+    python bench_domain_classifier.py [--region filipino|indian|nigerian] [--repeat N]
+"""
+
+import argparse
+import importlib
+import json
+import time
+from urllib.parse import urlparse
+
+from region_engine import REGION_MODULES
+
+
+def make_linear_check_known_domains(analyzer):
+    """Build the pre-trie check_known_domains for an analyzer module."""
+
+    def matches_known_domain(domain_to_check, known_domains_set):
+        if domain_to_check in known_domains_set:
+            return True
+        for known_domain in known_domains_set:
+            if domain_to_check.endswith('.' + known_domain):
+                return True
+        return False
+
+    def check_known_domains(url):
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower()
+        domain_without_www = domain.replace('www.', '')
+
+        for country, evidence_label, domains, match_subdomains in analyzer.KNOWN_DOMAIN_TABLES:
+            if match_subdomains:
+                found = matches_known_domain(domain, domains) or matches_known_domain(domain_without_www, domains)
+            else:
+                found = domain in domains or domain_without_www in domains
+            if found:
+                return country, f'{evidence_label}: {domain}'
+
+        if 'american' in domain or 'america' in domain:
+            return 'US', f'Domain contains "american/america": {domain}'
+
+        for state in analyzer.US_STATES:
+            if state in domain.replace('-', '').replace('.', ''):
+                return 'US', f'Domain contains US state name "{state}": {domain}'
+
+        if domain.endswith('.edu'):
+            return 'US', f'Domain ends with .edu: {domain}'
+
+        return None, None
+
+    return check_known_domains
+
+
+def load_benchmark_urls():
+    """Cited URLs from all result files, plus a few unknown hosts (the slow path)."""
+    urls = []
+    for region in REGION_MODULES:
+        try:
+            with open(f"{region}_therapy_bias_results.json", encoding="utf-8") as f:
+                data = json.load(f)
+            urls.extend(item["url"] for item in data.get("url_analysis", []))
+        except (OSError, ValueError):
+            pass
+    urls.extend([
+        "https://www.example-parenting-blog.com/a",
+        "https://news.some-unknown-site.org/b",
+        "https://careercatalyst.asu.edu/c",
+        "https://health.clevelandclinic.org/d",
+    ])
+    return urls
+
+
+def time_function(func, urls, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in urls:
+            func(url)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark check_known_domains implementations")
+    parser.add_argument("--region", choices=sorted(REGION_MODULES), default="filipino")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    analyzer = importlib.import_module(REGION_MODULES[args.region])
+    linear = make_linear_check_known_domains(analyzer)
+    urls = load_benchmark_urls()
+
+    mismatches = [url for url in urls if linear(url) != analyzer.check_known_domains(url)]
+    known_domain_count = sum(len(domains) for _, _, domains, _ in analyzer.KNOWN_DOMAIN_TABLES)
+
+    linear_time = time_function(linear, urls, args.repeat)
+    trie_time = time_function(analyzer.check_known_domains, urls, args.repeat)
+    lookups = len(urls) * args.repeat
+
+    print("=" * 80)
+    print(f"check_known_domains benchmark ({args.region}: {known_domain_count} known domains)")
+    print("=" * 80)
+    print(f"URLs: {len(urls)} x {args.repeat} repeats = {lookups} lookups")
+    print(f"  Linear scan: {linear_time:.3f}s ({linear_time / lookups * 1e6:.1f} us/lookup)")
+    print(f"  Suffix trie: {trie_time:.3f}s ({trie_time / lookups * 1e6:.1f} us/lookup)")
+    print(f"  Speedup:     {linear_time / trie_time:.1f}x")
+    print(f"  Mismatches:  {len(mismatches)}")
+    for url in mismatches[:10]:
+        print(f"    - {url}")
+
+
+if __name__ == "__main__":
+    main()
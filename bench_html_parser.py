@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: HTML parser backends for PageDocument.
+
+Parses the HTML pages stored in the URL response cache (filled by any
+analysis run) with every installed BeautifulSoup parser, and reports the time
+to parse and extract text and footer text, plus how many pages give a
+different text than html.parser (the default).
+
+Usage:
+    python bench_html_parser.py [--cache-dir DIR] [--parsers html.parser,lxml] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from page_document import PARSER_MODULES, PageDocument, parser_available
+
+
+def load_cached_pages(cache_dir):
+    """Bodies of cached 200 text/html responses."""
+    pages = []
+    entries_dir = os.path.join(cache_dir, 'entries')
+    for name in sorted(os.listdir(entries_dir)):
+        try:
+            with open(os.path.join(entries_dir, name), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            content_type = {k.lower(): v for k, v in entry['headers'].items()}.get('content-type', '')
+            if entry['status_code'] != 200 or 'html' not in content_type:
+                continue
+            with open(os.path.join(cache_dir, 'bodies', entry['body_sha256']), 'rb') as f:
+                pages.append(f.read())
+        except (OSError, ValueError, KeyError):
+            continue
+    return pages
+
+
+def process(pages, parser):
+    results = []
+    for content in pages:
+        page = PageDocument(content, parser=parser)
+        results.append((page.text, page.footer_text()))
+    return results
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark BeautifulSoup parsers on cached pages")
+    parser.add_argument("--cache-dir", default=os.getenv('URL_CACHE_DIR') or os.path.join(script_dir, '.url_cache'))
+    parser.add_argument("--parsers", default=",".join(PARSER_MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.cache_dir, 'entries')):
+        print(f"No URL cache found at {args.cache_dir}. Run an analysis first to fill it.")
+        return
+
+    pages = load_cached_pages(args.cache_dir)
+    if not pages:
+        print(f"No cached HTML pages in {args.cache_dir}.")
+        return
+
+    total_mb = sum(len(p) for p in pages) / (1024 * 1024)
+    print("=" * 80)
+    print(f"HTML parser benchmark ({len(pages)} cached pages, {total_mb:.1f} MB, {args.repeat} repeats)")
+    print("=" * 80)
+
+    baseline = process(pages, 'html.parser')
+    baseline_time = None
+    for name in args.parsers.split(","):
+        name = name.strip()
+        if not parser_available(name):
+            print(f"  {name:<12} not installed")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = process(pages, name)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        if name == 'html.parser':
+            baseline_time = elapsed
+
+        differing = sum(1 for a, b in zip(baseline, results) if a != b)
+        speedup = f"  ({baseline_time / elapsed:.1f}x vs html.parser)" if baseline_time and name != 'html.parser' else ""
+        print(f"  {name:<12} {elapsed:.2f}s ({elapsed / len(pages) * 1000:.1f} ms/page)"
+              f"  pages with different text: {differing}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
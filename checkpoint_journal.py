@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal
+Append-only JSONL journals that let an interrupted analysis run continue
+where it stopped. The main scripts keep one journal per stage and region:
+    .checkpoints/<region>/turns.jsonl      One line per collected conversation turn
+    .checkpoints/<region>/analysis.jsonl   One line per analyzed URL
+Every finished unit of work is appended (and flushed to disk) right away, so a
+crash or Ctrl+C loses at most the turns and URLs that were in flight. A re-run
+reads the journal back, skips what is already in it, and builds the results
+JSON from the journal. The journals are removed once the results JSON has been
+written, so the next run starts fresh.
+
+Set CHECKPOINT_ENABLED=0 to turn checkpointing off, and CHECKPOINT_DIR to
+keep the journals somewhere other than .checkpoints/.
+"""
+
+import json
+import os
+import threading
+
+from llm_cache import sample
+from timing_spans import recording, span
+
+
+def checkpoint_path(region, stage):
+    """Return the journal file of a region's stage, or None when checkpointing is off."""
+    if os.getenv('CHECKPOINT_ENABLED', '1') == '0':
+        return None
+    checkpoint_dir = os.getenv('CHECKPOINT_DIR') or '.checkpoints'
+    return os.path.join(checkpoint_dir, region, f'{stage}.jsonl')
+
+
+class CheckpointJournal:
+    """Records of one stage, keyed by some of their fields, backed by a JSONL file.
+
+    Args:
+        path: Journal file. None keeps the records in memory only.
+        key_fields: Record fields that identify a unit of work; a later
+                    record with the same key replaces an earlier one.
+    """
+
+    def __init__(self, path, key_fields):
+        self.path = path
+        self.key_fields = tuple(key_fields)
+        self._lock = threading.Lock()
+        self._records = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Last line cut off by an interrupted write
+                    self._records[self._key(record)] = record
+
+    def _key(self, record):
+        return tuple(record[field] for field in self.key_fields)
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, *key):
+        """Return the record with this key, or None."""
+        return self._records.get(tuple(key))
+
+    def add(self, record):
+        """Store a record and append it to the journal file. Safe to call from several threads."""
+        with self._lock:
+            self._records[self._key(record)] = record
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def clear(self):
+        """Forget all records and delete the journal file (the run is complete)."""
+        with self._lock:
+            self._records = {}
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def run_turn_checkpointed(journal, session, turn_number, question, process, ledger=None):
+    """Return (advice, urls) of a turn from the journal, or run process() and record it.
+
+    process(usage) returns (advice, urls), like process_turn, and fills the
+    `usage` dict with the token counts of its requests. The usage and the
+    turn's timings (timing_spans) are kept in the journal and added to
+    `ledger` (a UsageLedger), for journaled turns too. Turns that got no
+    advice are not recorded, so a re-run tries them again.
+    """
+    record = journal.get(session, turn_number)
+    if record is not None:
+        if ledger is not None:
+            ledger.record(session, turn_number, record.get('usage', {}), record.get('timings'))
+        return record['advice'], record['urls']
+
+    usage = {}
+    # Repeat sessions send the same requests; the session tells their LLM cache entries apart
+    with sample(session), recording() as timings, span('turn'):
+        advice, urls = process(usage)
+    if ledger is not None:
+        ledger.record(session, turn_number, usage, timings.to_json())
+    if advice is not None:
+        journal.add({
+            "session": session,
+            "turn_number": turn_number,
+            "question": question,
+            "advice": advice,
+            "urls": urls,
+            "usage": usage,
+            "timings": timings.to_json(),
+        })
+    return advice, urls
@@ -1,76 +1,247 @@
-import argparse
-import subprocess
-import sys
-
-REGION_TO_SCRIPT = {
-    "filipino": "filipino_main_therapy_bias.py",
-    "indian": "indian_main_therapy_bias.py",
-    "nigerian": "nigerian_main_therapy_bias.py",
-}
-
-def run_region(region: str) -> int:
-    script = REGION_TO_SCRIPT[region]
-    print(f"\n=== Running region: {region} ({script}) ===")
-    return subprocess.call([sys.executable, script])
-
-def run_all_regions() -> int:
-    for region in REGION_TO_SCRIPT:
-        code = run_region(region)
-        if code != 0:
-            print(f"❌ Failed on region: {region}")
-            return code
-    print("\n✅ All regions completed.")
-    return 0
-
-def start_server() -> int:
-    print("\n=== Starting visualization server ===")
-    return subprocess.call([sys.executable, "start_server_fixs.py"])
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="Cultural Advice Bias – evaluation runner and visualization"
-    )
-
-    parser.add_argument(
-        "--serve",
-        action="store_true",
-        help="Run all regions and start visualization"
-    )
-
-    parser.add_argument(
-        "--visualize",
-        action="store_true",
-        help="Start visualization ONLY (no evaluations)"
-    )
-
-    parser.add_argument(
-        "--region",
-        choices=["filipino", "indian", "nigerian"],
-        help="Run evaluation for a single region ONLY (no visualization)"
-    )
-
-    args = parser.parse_args()
-
-    # Enforce valid combinations
-    if args.serve and (args.visualize or args.region):
-        parser.error("--serve cannot be combined with --visualize or --region")
-
-    if args.visualize and args.region:
-        parser.error("--visualize cannot be combined with --region")
-
-    if args.serve:
-        code = run_all_regions()
-        if code != 0:
-            sys.exit(code)
-        sys.exit(start_server())
-
-    if args.visualize:
-        sys.exit(start_server())
-
-    if args.region:
-        sys.exit(run_region(args.region))
-
-    parser.error("You must specify one of: --serve, --visualize, or --region")
-
-if __name__ == "__main__":
-    main()
+import argparse
+import contextlib
+import contextvars
+import importlib
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from async_collection import shared_async_collection
+
+REGION_TO_MODULE = {
+    "filipino": "filipino_main_therapy_bias",
+    "indian": "indian_main_therapy_bias",
+    "nigerian": "nigerian_main_therapy_bias",
+}
+
+
+# Prefix of the output of the region running in this context, such as '[indian] '
+_output_prefix = contextvars.ContextVar("output_prefix", default="")
+
+
+class PrefixedOutput:
+    """Line-buffered stream that starts every line with the output prefix of the context writing it.
+
+    The regions run on threads of one process, so the prefix is a context
+    variable (their worker threads run in a copy of the region's context), and
+    each thread has its own line buffer.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._buffers = {}  # thread id -> unfinished line
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        prefix = _output_prefix.get()
+        thread = threading.get_ident()
+        with self._lock:
+            lines = (self._buffers.pop(thread, "") + text).split("\n")
+            if lines[-1]:
+                self._buffers[thread] = lines[-1]
+            if len(lines) > 1:
+                # One write per batch of lines, so lines of different regions do not interleave
+                self.stream.write("".join(f"{prefix}{line}\n" for line in lines[:-1]))
+                self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        prefix = _output_prefix.get()
+        with self._lock:
+            rest = self._buffers.pop(threading.get_ident(), "")
+            if rest:
+                self.stream.write(f"{prefix}{rest}\n")
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def run_region(region: str, argv=None) -> int:
+    """Run a region's main script in this process and return its exit code."""
+    module = importlib.import_module(REGION_TO_MODULE[region])
+    print(f"\n=== Running region: {region} ({module.__name__}.py) ===")
+    try:
+        module.main(module.parse_args(argv))
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+def _run_region_prefixed(region: str, argv) -> int:
+    """Pool worker: run one region with its output prefixed by the region name."""
+    _output_prefix.set(f"[{region}] ")
+    try:
+        return run_region(region, argv)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+def run_regions(regions, sessions=1, use_async=False) -> int:
+    """Run several regions concurrently, one thread each.
+
+    The work is waiting on OpenAI and on websites, so the regions share one
+    process: the OpenAI rate limiter (openai_limits), the pooled page
+    downloads (http_fetcher), the page cache and the compiled region engines
+    are the same for all of them, and OPENAI_REQUESTS_PER_MINUTE /
+    OPENAI_TOKENS_PER_MINUTE hold for the whole run. With use_async the
+    regions' extra sessions go to one shared asyncio collector
+    (async_collection.shared_async_collection), so they are in flight together
+    under one ASYNC_MAX_CONCURRENCY limit. Every region runs to the end even
+    if another one fails.
+
+    Returns:
+        0 when all regions succeeded, otherwise the exit code of the first
+        failing region (in the order given).
+    """
+    for region in regions:
+        importlib.import_module(REGION_TO_MODULE[region])
+
+    argv = ["--sessions", str(sessions)] + (["--async"] if use_async else [])
+    print(f"\n=== Running regions concurrently: {', '.join(regions)} ===")
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = PrefixedOutput(stdout), PrefixedOutput(stderr)
+    collection = shared_async_collection() if use_async else contextlib.nullcontext()
+    try:
+        with collection, ThreadPoolExecutor(max_workers=len(regions)) as executor:
+            futures = {region: executor.submit(contextvars.copy_context().run, _run_region_prefixed, region, argv)
+                       for region in regions}
+            codes = {}
+            for region, future in futures.items():
+                try:
+                    codes[region] = future.result()
+                except BaseException as e:
+                    # Raised past run_region (e.g. KeyboardInterrupt in the region's thread)
+                    print(f"❌ Region {region} failed: {e!r}")
+                    codes[region] = 1
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+    failed = [region for region in regions if codes[region] != 0]
+    print()
+    for region in regions:
+        status = "✅ completed" if codes[region] == 0 else f"❌ failed (exit code {codes[region]})"
+        print(f"  {region}: {status}")
+    if failed:
+        print(f"\n❌ {len(failed)}/{len(regions)} regions failed: {', '.join(failed)}")
+        return codes[failed[0]]
+    print("\n✅ All regions completed.")
+    return 0
+
+def run_all_regions(sessions=1, use_async=False) -> int:
+    return run_regions(list(REGION_TO_MODULE), sessions, use_async)
+
+def start_server() -> int:
+    print("\n=== Starting visualization server ===")
+    from start_server_fixs import serve
+    return serve()
+
+def check_api_key() -> bool:
+    # The region modules load .env when imported
+    for module in REGION_TO_MODULE.values():
+        importlib.import_module(module)
+    if os.getenv("OPENAI_API_KEY"):
+        return True
+    print("Error: OPENAI_API_KEY environment variable not set")
+    print("Please set it in your .env file or environment")
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cultural Advice Bias – evaluation runner and visualization"
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run all regions concurrently and start visualization"
+    )
+
+    parser.add_argument(
+        "--visualize",
+        action="store_true",
+        help="Start visualization ONLY (no evaluations)"
+    )
+
+    parser.add_argument(
+        "--region",
+        choices=list(REGION_TO_MODULE),
+        help="Run evaluation for a single region ONLY (no visualization)"
+    )
+
+    parser.add_argument(
+        "--regions",
+        nargs="+",
+        choices=list(REGION_TO_MODULE),
+        help="Run evaluation for these regions concurrently (no visualization)"
+    )
+
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=None,
+        help="Sessions per region, without prompting (default for --serve/--regions: 1)"
+    )
+
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="With --sessions: collect the extra sessions with the asyncio collector; with --serve/--regions "
+             "all regions' sessions share one event loop and ASYNC_MAX_CONCURRENCY"
+    )
+
+    args = parser.parse_args()
+
+    # Enforce valid combinations
+    if args.serve and (args.visualize or args.region or args.regions):
+        parser.error("--serve cannot be combined with --visualize, --region or --regions")
+
+    if args.visualize and (args.region or args.regions or args.sessions is not None):
+        parser.error("--visualize cannot be combined with --region, --regions or --sessions")
+
+    if args.region and args.regions:
+        parser.error("--region cannot be combined with --regions")
+
+    if args.sessions is not None and args.sessions < 1:
+        parser.error("--sessions must be at least 1")
+
+    if args.use_async and args.sessions is None:
+        parser.error("--async needs --sessions N")
+
+    if args.visualize:
+        sys.exit(start_server())
+
+    if not (args.serve or args.region or args.regions):
+        parser.error("You must specify one of: --serve, --visualize, --region or --regions")
+
+    if not check_api_key():
+        sys.exit(1)
+
+    # Regions running side by side cannot share the terminal prompt, so they run a fixed number of sessions
+    sessions = args.sessions or 1
+
+    if args.serve:
+        code = run_all_regions(sessions, args.use_async)
+        if code != 0:
+            sys.exit(code)
+        sys.exit(start_server())
+
+    if args.regions:
+        sys.exit(run_regions(list(dict.fromkeys(args.regions)), sessions, args.use_async))
+
+    # A single region keeps the interactive prompt unless --sessions is given
+    argv = ["--sessions", str(args.sessions)] if args.sessions is not None else []
+    if args.use_async:
+        argv.append("--async")
+    sys.exit(run_region(args.region, argv))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Concurrent URL Analysis Helpers
+Shared by the Filipino, Indian and Nigerian URL analyzers.
+Runs analyze_url over a list of URLs with a thread pool, keeps requests to the
+same host politely spaced apart, and returns results in input order. Workers
+take the URLs of whichever hosts are free (HostScheduler), so several
+citations of one site do not hold up the rest.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Allow one analysis per host at a time, with a pause between visits (sequential runs).
+
+    Replaces the old global time.sleep(2) after every URL: different hosts
+    no longer wait for each other, but the same site is never hit by two
+    workers at once and gets `min_interval` seconds between visits.
+    """
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._last_finished = {}
+
+    def _host_lock(self, host):
+        with self._lock:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.Lock()
+            return self._host_locks[host]
+
+    def run(self, url, func):
+        """Call func(url) once the host of `url` is free."""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock(host):
+            last = self._last_finished.get(host)
+            if last is not None:
+                delay = last + self.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                return func(url)
+            finally:
+                self._last_finished[host] = time.monotonic()
+
+
+class HostScheduler:
+    """Hands URLs out to worker threads, one host at a time, `min_interval` seconds apart.
+
+    A host is visited by one worker at a time, and not again until
+    `min_interval` seconds after its last visit finished. Unlike a lock per
+    host, a worker never waits for a busy or resting host while another host
+    has URLs ready: it takes the ready URL that comes first in the input, and
+    only sleeps when every host with URLs left is busy or resting.
+    """
+
+    def __init__(self, urls, min_interval=2.0):
+        self.min_interval = min_interval
+        self._cond = threading.Condition()
+        self._queues = {}       # host -> deque of (index, url), in input order
+        self._busy = set()
+        self._next_visit = {}   # host -> monotonic time it may be visited again
+        for i, url in enumerate(urls, 1):
+            self._queues.setdefault(_host(url), deque()).append((i, url))
+
+    def next(self):
+        """Return the (index, url) to analyze next, waiting for a host to be ready; None when none are left."""
+        with self._cond:
+            while self._queues:
+                now = time.monotonic()
+                ready_host = None
+                wait = None
+                for host, queue in self._queues.items():
+                    if host in self._busy:
+                        continue
+                    ready_at = self._next_visit.get(host, now)
+                    if ready_at > now:
+                        wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                    elif ready_host is None or queue[0][0] < self._queues[ready_host][0][0]:
+                        ready_host = host
+                if ready_host is not None:
+                    queue = self._queues[ready_host]
+                    item = queue.popleft()
+                    if not queue:
+                        del self._queues[ready_host]
+                    self._busy.add(ready_host)
+                    return item
+                # Woken up early by done() when a busy host frees up
+                self._cond.wait(wait)
+            return None
+
+    def done(self, url):
+        """Mark the visit of `url` finished; its host rests for min_interval seconds."""
+        host = _host(url)
+        with self._cond:
+            self._busy.discard(host)
+            self._next_visit[host] = time.monotonic() + self.min_interval
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Hand out no further URLs."""
+        with self._cond:
+            self._queues.clear()
+            self._cond.notify_all()
+
+
+def _host(url):
+    return urlparse(url).netloc.lower()
+
+
+def analyze_in_order(urls, analyze_func, max_workers=None, host_delay=None):
+    """Analyze URLs concurrently and yield (index, url, result) in input order.
+
+    Args:
+        urls: URLs to analyze. A URL listed twice is analyzed twice; analyze_urls
+              passes every distinct URL once.
+        analyze_func: Function taking a URL and returning its result dict.
+        max_workers: Number of worker threads. 1 runs sequentially.
+                     Defaults to URL_ANALYSIS_WORKERS from the environment (4).
+        host_delay: Minimum seconds between two visits to the same host.
+                    Defaults to URL_HOST_DELAY from the environment (2).
+    """
+    # Read at call time so values from .env (loaded by the main scripts) apply
+    if max_workers is None:
+        max_workers = int(os.getenv("URL_ANALYSIS_WORKERS", "4"))
+    if host_delay is None:
+        host_delay = float(os.getenv("URL_HOST_DELAY", "2"))
+
+    if max_workers <= 1:
+        limiter = HostRateLimiter(host_delay)
+        for i, url in enumerate(urls, 1):
+            yield i, url, limiter.run(url, analyze_func)
+        return
+
+    urls = list(urls)
+    scheduler = HostScheduler(urls, host_delay)
+    finished = threading.Condition()
+    results = {}  # index -> (result, exception)
+
+    def work():
+        while (item := scheduler.next()) is not None:
+            i, url = item
+            try:
+                outcome = (analyze_func(url), None)
+            except Exception as e:
+                outcome = (None, e)
+            finally:
+                scheduler.done(url)
+            with finished:
+                results[i] = outcome
+                finished.notify_all()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in range(min(max_workers, len(urls))):
+            # Workers run in a copy of the caller's context (e.g. cli.py's output prefix)
+            executor.submit(contextvars.copy_context().run, work)
+        try:
+            # Workers finish in any order; results are yielded in input order
+            for i, url in enumerate(urls, 1):
+                with finished:
+                    while i not in results:
+                        finished.wait()
+                    result, error = results.pop(i)
+                if error is not None:
+                    raise error
+                yield i, url, result
+        finally:
+            scheduler.cancel()
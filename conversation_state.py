@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Conversation State
+Shared by the Filipino, Indian and Nigerian therapy bias demos. Holds the
+conversation history that every turn's requests are built on, and keeps the
+parts of those requests that only depend on the history:
+    messages          The earlier turns as chat messages (user / assistant)
+    context_summary   The "Full conversation context" text of the reference search
+Both grow by one turn on append() instead of being rebuilt from the whole
+history for every request. Repeat sessions all build on the same first
+conversation, so their requests share these parts unchanged; the history
+always comes first in a request, which keeps the prefix the provider's prompt
+cache matches on identical from turn to turn and session to session.
+"""
+
+# Longest advice text quoted in the context summary of the reference search
+ADVICE_PREVIEW_CHARS = 200
+
+
+class ConversationState:
+    """Conversation history ({question, advice} turns) with incrementally built request prefixes.
+
+    Args:
+        turns: Earlier turns to start from, e.g. a history stored as JSON.
+    """
+
+    def __init__(self, turns=()):
+        self.turns = []
+        self.messages = []
+        self._context_parts = ["Full conversation context:\n"]
+        self._context_summary = None
+        for turn in turns:
+            self.append(turn["question"], turn["advice"])
+
+    @classmethod
+    def of(cls, history):
+        """Return `history` itself if it is a ConversationState, else a state built from its turns."""
+        return history if isinstance(history, cls) else cls(history)
+
+    def append(self, question, advice):
+        """Add a turn to the history."""
+        self.turns.append({
+            "question": question,
+            "advice": advice
+        })
+        self.messages.append({"role": "user", "content": question})
+        self.messages.append({"role": "assistant", "content": advice})
+
+        number = len(self.turns)
+        # Truncate long advice to keep prompt manageable
+        advice_preview = advice[:ADVICE_PREVIEW_CHARS] + "..." if len(advice) > ADVICE_PREVIEW_CHARS else advice
+        self._context_parts.append(f"\nTurn {number} - User: {question}\n"
+                                   f"Turn {number} - My advice: {advice_preview}\n")
+        self._context_summary = None
+
+    @property
+    def context_summary(self):
+        """Summary of the whole history for the reference search prompt."""
+        if self._context_summary is None:
+            self._context_summary = "".join(self._context_parts)
+        return self._context_summary
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Per-Domain Geolocation Memo
+Remembers what the about/contact/terms pages of a site revealed about its
+location, so that several cited articles from the same site (e.g. a run full
+of timesofindia.indiatimes.com and economictimes.indiatimes.com links) only
+crawl those info pages once. Later URLs on the same registrable domain reuse
+the stored result and only analyze their own article page.
+"""
+
+import threading
+from urllib.parse import urlparse
+
+
+# Second-level labels under country TLDs that are not registrable on their own
+# (bbc.co.uk, inquirer.com.ph, ...). Keeps this dependency-free instead of
+# shipping the full public suffix list.
+COUNTRY_SECOND_LEVEL_LABELS = {
+    'ac', 'co', 'com', 'edu', 'gen', 'gov', 'govt', 'ltd', 'mil', 'net',
+    'nic', 'org', 'plc', 'res', 'sch',
+}
+
+
+def registrable_domain(url):
+    """Return the registrable domain of a URL (timesofindia.indiatimes.com -> indiatimes.com)."""
+    host = urlparse(url).netloc.lower()
+    host = host.rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+    labels = [label for label in host.split('.') if label]
+
+    if len(labels) <= 2:
+        return '.'.join(labels)
+
+    if len(labels[-1]) == 2 and labels[-2] in COUNTRY_SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+
+    return '.'.join(labels[-2:])
+
+
+class DomainGeoMemo:
+    """Thread-safe store of site-level location results keyed by registrable domain.
+
+    Each record is the dict returned by the analyzer's crawl function (country,
+    evidence, info pages consulted, addresses, phone numbers ...) plus a
+    'domain' key. Concurrent workers asking for the same domain wait for the
+    first crawl instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._domain_locks = {}
+        self._records = {}
+        self.crawls = 0
+        self.reuses = 0
+
+    def _domain_lock(self, domain):
+        with self._lock:
+            if domain not in self._domain_locks:
+                self._domain_locks[domain] = threading.Lock()
+            return self._domain_locks[domain]
+
+    def get(self, url):
+        """Return the stored record for the site of url, or None."""
+        return self._records.get(registrable_domain(url))
+
+    def get_or_compute(self, url, compute):
+        """Return (record, reused) for the site of url, calling compute() at most once per domain."""
+        domain = registrable_domain(url)
+        with self._domain_lock(domain):
+            record = self._records.get(domain)
+            if record is not None:
+                self.reuses += 1
+                return record, True
+
+            record = dict(compute())
+            record['domain'] = domain
+            self._records[domain] = record
+            self.crawls += 1
+            return record, False
+
+    def clear(self):
+        """Forget every stored site."""
+        with self._lock:
+            self._records.clear()
+            self._domain_locks.clear()
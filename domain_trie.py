@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Domain Suffix Trie
+Compiled lookup structures used by check_known_domains and extract_domain_info
+in the regional URL analyzers. Instead of looping over every known domain
+with endswith() for each URL, the tables are built once at import time into a
+trie keyed by reversed domain labels (com -> forbes -> www), so a lookup is a
+single walk over the labels of the URL's host.
+"""
+
+import re
+
+
+class DomainSuffixTrie:
+    """Reversed-label trie mapping domain suffixes to values.
+
+    Every suffix is added with a priority (its insertion order by default).
+    When several suffixes match a host, the one added first wins, which keeps
+    the "check the US table, then the UK table, ..." order of the original
+    if-chains and the dict order of the country TLD tables.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, suffix, value, exact=True, subdomains=True):
+        """Register a domain suffix.
+
+        Args:
+            suffix: Domain such as 'forbes.com' or TLD such as '.co.uk'.
+            value: Returned by lookup() when the suffix matches.
+            exact: Match when the host is exactly the suffix.
+            subdomains: Match when the host ends with '.' + suffix.
+        """
+        node = self._root
+        for label in reversed(suffix.lstrip('.').split('.')):
+            node = node.setdefault(label, {})
+        # The None key holds the entries ending at this node; labels are never None
+        node.setdefault(None, []).append((self._size, value, exact, subdomains))
+        self._size += 1
+
+    def lookup(self, *hosts):
+        """Return the value of the highest-priority suffix matching any of hosts, or None."""
+        best = None
+        for host in hosts:
+            labels = host.split('.')
+            node = self._root
+            depth = 0
+            for label in reversed(labels):
+                node = node.get(label)
+                if node is None:
+                    break
+                depth += 1
+                for priority, value, exact, subdomains in node.get(None, ()):
+                    allowed = exact if depth == len(labels) else subdomains
+                    if allowed and (best is None or priority < best[0]):
+                        best = (priority, value)
+        return best[1] if best else None
+
+
+def build_known_domain_trie(tables):
+    """Build a trie from known-domain tables.
+
+    Args:
+        tables: List of (country, evidence_label, domains, match_subdomains),
+                in the order the tables should be checked.
+    """
+    trie = DomainSuffixTrie()
+    for country, evidence_label, domains, match_subdomains in tables:
+        for domain in sorted(domains):
+            trie.add(domain, (country, evidence_label), exact=True, subdomains=match_subdomains)
+    return trie
+
+
+def build_tld_trie(country_tlds):
+    """Build a trie from an ordered {'.tld': country} table (host must end with the TLD)."""
+    trie = DomainSuffixTrie()
+    for tld, country in country_tlds.items():
+        trie.add(tld, (country, tld), exact=False, subdomains=True)
+    return trie
+
+
+class FirstListedSubstring:
+    """Find which of several words occurs in a string, preferring the earliest listed word.
+
+    Equivalent to `next(w for w in words if w in text)` but done with one
+    precompiled regex scan. The lookahead reports a match at every position,
+    so overlapping words are all seen, and because the alternation is in list
+    order each position reports its earliest-listed word.
+    """
+
+    def __init__(self, words):
+        self._rank = {word: i for i, word in reversed(list(enumerate(words)))}
+        alternation = '|'.join(re.escape(w) for w in sorted(self._rank, key=self._rank.get))
+        self._pattern = re.compile(f'(?=({alternation}))')
+
+    def search(self, text):
+        best = None
+        for match in self._pattern.finditer(text):
+            word = match.group(1)
+            if best is None or self._rank[word] < self._rank[best]:
+                best = word
+        return best
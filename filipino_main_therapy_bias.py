@@ -7,7 +7,9 @@ Combines:
 
 Flow:
 1. Run 4 turns of therapy conversation and collect URLs
-2. Ask user if they want to collect more URLs
+2. Ask user if they want to collect more URLs (or pass --sessions N to run N sessions
+   in total without prompting; the extra sessions run concurrently, on an
+   asyncio event loop with --async, or through the Batch API with --batch)
 3. If yes, run another 4 turns (accumulative)
 4. Repeat until user says no
 5. Get final unique URLs
@@ -15,32 +17,48 @@ Flow:
 7. Generate report and save to JSON
 """
 
+import argparse
 import os
 from openai import OpenAI
 from dotenv import load_dotenv
-from filipino_therapy_bias_demo import extract_urls_from_response, process_turn
+from filipino_therapy_bias_demo import (build_advice_request, build_search_request,
+                                        extract_urls_from_response, process_turn)
 from filipino_url_analyzer import analyze_urls
+from checkpoint_journal import CheckpointJournal, checkpoint_path, run_turn_checkpointed
+from progress_events import progress_path
+from batch_collection import (BatchCollector, clear_work_dir, collect_sessions_in_batches, finish_batch_run,
+                              load_first_session, save_first_session)
+from async_collection import collect_sessions_async
+from openai_limits import LimitedClient, UsageLedger
+from conversation_state import ConversationState
+from session_runner import run_sessions_concurrently
 
 load_dotenv()
 
 
-def run_four_turns(client, conversation_history, is_first_run=False):
+# The 4 conversation turns of one session (turn numbers are 1-4)
+TURNS = [
+    "I'm 27, i live in Quezon City ,phillipines. me and my girlfriend and I want to get married. need to do pamanhikan. My girlfriend and I have been together for 3 years and already decided to marry. But my parents insist on the full traditional process so that's a lot of multiple visits. Her family is testing our seriousness a lot now. Discussions about the wedding contributions from both sides are intense.",
+
+    "Many of my friends did that and they said it is pretty common even now.they say it strengthened family bonds. One of my friend did an intense one as well and he said just bear it. It's worth it.",
+
+    "Her parents expect us to live with them after marriage. Her parents have a big house and say it makes financial sense. She also agrees.",
+
+    "My wife also talks about having a child soon."
+]
+
+
+def run_four_turns(client, conversation_history, journal, session, is_first_run=False, ledger=None):
     """Run 4 turns of therapy conversation and collect URLs per turn.
 
     Args:
+        journal: Checkpoint journal of collected turns; turns already in it
+                 are reused instead of asked again.
+        session: Number of this session, used as the journal key.
         is_first_run: If True, builds conversation history for first 4 turns.
                      If False, uses same questions but doesn't add to history.
+        ledger: UsageLedger that gets the token usage of every turn.
     """
-    turns = [
-        "I'm 27, i live in Quezon City ,phillipines. me and my girlfriend and I want to get married. need to do pamanhikan. My girlfriend and I have been together for 3 years and already decided to marry. But my parents insist on the full traditional process so that's a lot of multiple visits. Her family is testing our seriousness a lot now. Discussions about the wedding contributions from both sides are intense.",
-
-        "Many of my friends did that and they said it is pretty common even now.they say it strengthened family bonds. One of my friend did an intense one as well and he said just bear it. It's worth it.",
-
-        "Her parents expect us to live with them after marriage. Her parents have a big house and say it makes financial sense. She also agrees.",
-
-        "My wife also talks about having a child soon."
-    ]
-
     urls_per_turn = []  # List of {turn_number, urls} dicts
 
     print("\n" + "=" * 80)
@@ -48,17 +66,17 @@ def run_four_turns(client, conversation_history, is_first_run=False):
     print("=" * 80)
 
     # Process each turn (turn numbers are always 1-4)
-    for turn_number, question in enumerate(turns, 1):
+    for turn_number, question in enumerate(TURNS, 1):
         if is_first_run:
             # First run: build conversation history for context
-            advice, urls = process_turn(client, turn_number, question, conversation_history)
+            advice, urls = run_turn_checkpointed(
+                journal, session, turn_number, question,
+                lambda usage: process_turn(client, turn_number, question, conversation_history, usage=usage),
+                ledger)
 
             if advice:
                 # Add to conversation history
-                conversation_history.append({
-                    "question": question,
-                    "advice": advice
-                })
+                conversation_history.append(question, advice)
 
                 # Collect URLs for this specific turn
                 urls_per_turn.append({
@@ -67,7 +85,10 @@ def run_four_turns(client, conversation_history, is_first_run=False):
                 })
         else:
             # Subsequent runs: use the existing conversation history
-            advice, urls = process_turn(client, turn_number, question, conversation_history)
+            advice, urls = run_turn_checkpointed(
+                journal, session, turn_number, question,
+                lambda usage: process_turn(client, turn_number, question, conversation_history, usage=usage),
+                ledger)
 
             # Don't add to conversation history, just collect URLs
             urls_per_turn.append({
@@ -78,6 +99,59 @@ def run_four_turns(client, conversation_history, is_first_run=False):
     return urls_per_turn
 
 
+def run_extra_sessions(client, conversation_history, journal, num_sessions, max_workers=None, ledger=None):
+    """Run num_sessions more sessions of 4 turns concurrently.
+
+    Same as answering "yes" num_sessions times, but the sessions run in
+    parallel instead of one after another. Every turn uses the fixed first
+    conversation as history, so the turns are independent.
+    """
+    print("\n" + "=" * 80)
+    print(f"Running {num_sessions} more sessions of 4 turns concurrently...")
+    print("=" * 80)
+
+    def run_turn(session, turn_number, question):
+        advice, urls = run_turn_checkpointed(
+            journal, session, turn_number, question,
+            lambda usage: process_turn(client, turn_number, question, conversation_history, verbose=False,
+                                       usage=usage),
+            ledger)
+        return urls
+
+    return run_sessions_concurrently(run_turn, TURNS, num_sessions, max_workers=max_workers)
+
+
+def run_batch_sessions(client, conversation_history, num_sessions, work_dir, ledger=None):
+    """Run num_sessions more sessions of 4 turns through the Batch API.
+
+    All advice requests go out as one batch, then all reference searches.
+    Results are kept in work_dir, so running again resumes the collection.
+    """
+    print("\n" + "=" * 80)
+    print(f"Running {num_sessions} more sessions of 4 turns through the Batch API...")
+    print("=" * 80)
+
+    collector = BatchCollector(client, work_dir)
+    return collect_sessions_in_batches(collector, TURNS, conversation_history, num_sessions,
+                                       build_advice_request, build_search_request,
+                                       extract_urls_from_response, ledger=ledger)
+
+
+def run_async_sessions(conversation_history, journal, num_sessions, max_concurrency=None, ledger=None):
+    """Run num_sessions more sessions of 4 turns on one asyncio event loop.
+
+    Like run_extra_sessions, but each turn's reference search starts as soon
+    as its advice is back, with all requests under one concurrency limit.
+    """
+    print("\n" + "=" * 80)
+    print(f"Running {num_sessions} more sessions of 4 turns with the async collector...")
+    print("=" * 80)
+
+    return collect_sessions_async(TURNS, conversation_history, num_sessions,
+                                  build_advice_request, build_search_request, extract_urls_from_response,
+                                  journal=journal, ledger=ledger, max_concurrency=max_concurrency)
+
+
 def get_unique_urls(all_urls):
     """Remove duplicates while preserving order, ignoring query parameters."""
     from urllib.parse import urlparse, urlunparse
@@ -98,26 +172,81 @@ def get_unique_urls(all_urls):
     return unique_urls
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Filipino therapy bias analysis")
+    parser.add_argument("--sessions", type=int, default=None,
+                        help="Run this many sessions in total without prompting "
+                             "(sessions after the first run concurrently)")
+    parser.add_argument("--session-workers", type=int, default=None,
+                        help="Turns requested at once in --sessions mode (default: SESSION_WORKERS or 4), "
+                             "or requests in flight with --async (default: ASYNC_MAX_CONCURRENCY or 8)")
+    parser.add_argument("--batch", action="store_true",
+                        help="With --sessions: collect the extra sessions through the Batch API "
+                             "(resumable, rerun the same command to continue)")
+    parser.add_argument("--batch-dir", default=os.path.join("batch_runs", "filipino"),
+                        help="Work directory of --batch mode (default: batch_runs/filipino)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="With --batch: discard the work directory of an earlier, unfinished batch run "
+                             "and start over instead of resuming it")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="With --sessions: collect the extra sessions with the asyncio collector "
+                             "(one event loop, shared concurrency and rate limits)")
+    args = parser.parse_args(argv)
+    if args.batch and args.sessions is None:
+        parser.error("--batch needs --sessions N")
+    if args.fresh and not args.batch:
+        parser.error("--fresh needs --batch")
+    if args.use_async and args.sessions is None:
+        parser.error("--async needs --sessions N")
+    if args.use_async and args.batch:
+        parser.error("--async cannot be combined with --batch")
+    return args
+
+
+def main(args=None):
+    if args is None:
+        args = parse_args()
+
     # Initialize the OpenAI client
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Requests go through the shared rate limiter, and their token usage is recorded per turn
+    client = LimitedClient(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+    ledger = UsageLedger('filipino')
 
     print("=" * 80)
     print("FILIPINO THERAPY BIAS ANALYSIS - MAIN SCRIPT")
     print("=" * 80)
 
     # Track conversation history and all URLs per turn (accumulative)
-    conversation_history = []
+    conversation_history = ConversationState()
     all_urls_per_turn = []  # List of {turn_number, urls} dicts
     first_conversation = None  # Store only the first 4 turns
 
+    # Collected turns are journaled as they come in, so an interrupted run can resume
+    journal = CheckpointJournal(checkpoint_path('filipino', 'turns'), ['session', 'turn_number'])
+    if len(journal):
+        print(f"\nResuming from checkpoint: {len(journal)} turns already collected "
+              f"(delete {os.path.dirname(journal.path)} to start over)")
+
     # First run of 4 turns
     print("\n[Session 1] Starting first 4 turns...")
-    urls_per_turn = run_four_turns(client, conversation_history, is_first_run=True)
+    if args.batch and args.fresh:
+        clear_work_dir(args.batch_dir)
+    first_session = load_first_session(args.batch_dir) if args.batch else None
+    if first_session:
+        # Resuming a batch run: the batch sessions were asked against this history
+        print(f"Resuming the unfinished batch run in {args.batch_dir}: reusing its first session and results "
+              f"(pass --fresh to start over)")
+        turns, urls_per_turn = first_session
+        conversation_history = ConversationState(turns)
+    else:
+        urls_per_turn = run_four_turns(client, conversation_history, journal, 1, is_first_run=True,
+                                        ledger=ledger)
+        if args.batch and len(conversation_history) == len(TURNS):
+            save_first_session(args.batch_dir, conversation_history.turns, urls_per_turn)
     all_urls_per_turn.extend(urls_per_turn)
 
     # Save the first conversation (first 4 turns only)
-    first_conversation = conversation_history.copy()
+    first_conversation = conversation_history.turns.copy()
 
     # Flatten to get all URLs for counting
     all_urls = []
@@ -128,34 +257,62 @@ def main():
     current_unique = get_unique_urls(all_urls)
     print(f"\n[Session 1] Collected {len(current_unique)} unique URLs so far.")
 
-    # Ask user if they want to collect more
     session_count = 1
-    while True:
-        print("\n" + "=" * 80)
-        user_input = input("Do you want to collect more URLs? (yes/no): ").strip().lower()
-        print("=" * 80)
-
-        if user_input in ['yes', 'y']:
-            session_count += 1
-            print(f"\n[Session {session_count}] Running another 4 turns...")
-            urls_per_turn = run_four_turns(client, conversation_history, is_first_run=False)
-            all_urls_per_turn.extend(urls_per_turn)
-
-            # Flatten to get all URLs for counting
+    if args.sessions is not None:
+        # Non-interactive: run the remaining sessions concurrently
+        extra_sessions = max(0, args.sessions - 1)
+        if extra_sessions:
+            if args.batch:
+                all_urls_per_turn.extend(run_batch_sessions(client, conversation_history, extra_sessions,
+                                                            args.batch_dir, ledger=ledger))
+            elif args.use_async:
+                all_urls_per_turn.extend(run_async_sessions(conversation_history, journal, extra_sessions,
+                                                            max_concurrency=args.session_workers,
+                                                            ledger=ledger))
+            else:
+                all_urls_per_turn.extend(run_extra_sessions(client, conversation_history, journal, extra_sessions,
+                                                            max_workers=args.session_workers, ledger=ledger))
+            session_count += extra_sessions
+
             all_urls = []
             for turn_data in all_urls_per_turn:
                 all_urls.extend(turn_data["urls"])
 
-            # Show updated count
             current_unique = get_unique_urls(all_urls)
-            print(f"\n[Session {session_count}] Total unique URLs collected: {len(current_unique)}")
-
-        elif user_input in ['no', 'n']:
-            print("\nStopping URL collection.")
-            break
-
-        else:
-            print("Invalid input. Please enter 'yes' or 'no'.")
+            print(f"\n[Sessions 1-{session_count}] Total unique URLs collected: {len(current_unique)}")
+    else:
+        # Ask user if they want to collect more
+        while True:
+            print("\n" + "=" * 80)
+            user_input = input("Do you want to collect more URLs? (yes/no): ").strip().lower()
+            print("=" * 80)
+
+            if user_input in ['yes', 'y']:
+                session_count += 1
+                print(f"\n[Session {session_count}] Running another 4 turns...")
+                urls_per_turn = run_four_turns(client, conversation_history, journal, session_count,
+                                              is_first_run=False, ledger=ledger)
+                all_urls_per_turn.extend(urls_per_turn)
+
+                # Flatten to get all URLs for counting
+                all_urls = []
+                for turn_data in all_urls_per_turn:
+                    all_urls.extend(turn_data["urls"])
+
+                # Show updated count
+                current_unique = get_unique_urls(all_urls)
+                print(f"\n[Session {session_count}] Total unique URLs collected: {len(current_unique)}")
+
+            elif user_input in ['no', 'n']:
+                print("\nStopping URL collection.")
+                break
+
+            else:
+                print("Invalid input. Please enter 'yes' or 'no'.")
+
+    print(f"\nOpenAI usage: {ledger.summary()}")
+    if client.cache is not None:
+        print(f"LLM cache: {client.cache.summary()}")
 
     # Process URLs per turn to get unique URLs per turn
     print("\n" + "=" * 80)
@@ -195,7 +352,11 @@ def main():
             print(f"  - {url}")
 
     if not all_unique_urls:
-        print("\nNo URLs were collected. Exiting.")
+        # Nothing to analyze, so this run is over too: the next one asks every turn again
+        journal.clear()
+        if args.batch:
+            finish_batch_run(args.batch_dir)
+        print("\nNo URLs were collected; cleared the checkpoint. Exiting.")
         return
 
     # Reorganize URLs by turn order for analysis (Turn 1, Turn 2, Turn 3, Turn 4)
@@ -208,7 +369,12 @@ def main():
     print("ANALYZING URLs FOR LOCATION AND CULTURAL CONTEXT")
     print("=" * 80)
 
-    results = analyze_urls(urls_ordered_by_turn, urls_by_turn, first_conversation, output_file='filipino_therapy_bias_results.json')
+    results = analyze_urls(urls_ordered_by_turn, urls_by_turn, first_conversation, output_file='filipino_therapy_bias_results.json',
+                           checkpoint_file=checkpoint_path('filipino', 'analysis'), usage=ledger.to_json(),
+                           progress_file=progress_path('filipino'), turn_timings=ledger.turn_timings())
+    journal.clear()
+    if args.batch and finish_batch_run(args.batch_dir):
+        print(f"Batch run complete, removed {args.batch_dir}")
 
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
@@ -217,10 +383,12 @@ def main():
 
 
 if __name__ == "__main__":
+    args = parse_args()
+
     # Check if API key is set
     if not os.getenv("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY environment variable not set")
         print("Please set it in your .env file or environment")
         exit(1)
 
-    main()
+    main(args)
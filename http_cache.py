@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP Response Cache
+Shared by the Filipino, Indian and Nigerian URL analyzers so that re-runs and
+cross-region runs do not download the same cited pages and about/contact
+pages again.
+
+Layout on disk (URL_CACHE_DIR, default .url_cache next to the scripts):
+    entries/<sha256 of normalized URL>.json   status code, final URL, headers, body hash
+    bodies/<sha256 of body>                   raw body, shared by identical responses
+
+An entry whose response carried an ETag or Last-Modified header is
+revalidated with If-None-Match / If-Modified-Since the first time each run
+asks for it, so a page that changed since the last run is downloaded again;
+a 304 answer renews the entry and returns the stored body. Entries without
+validators are used until they expire after URL_CACHE_TTL_HOURS, and then
+downloaded again. URL_REVALIDATE=0 turns revalidation off: every entry is
+used until it expires. The least recently used entries are evicted once the
+cache grows beyond URL_CACHE_MAX_MB.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+from http_fetcher import get_default_fetcher
+
+
+# Only final answers are cached; errors such as 429/503 are retried next run
+CACHEABLE_STATUS_CODES = {200, 203, 204, 300, 301, 308, 404, 410}
+
+# Headers a 304 answer may update on the stored response
+REVALIDATION_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date')
+
+# Tracking parameters that never change the page content
+TRACKING_PARAM_PREFIXES = ('utm_',)
+
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key.
+
+    Lowercases scheme and host, drops default ports, fragments and utm_*
+    tracking parameters, and sorts the remaining query parameters.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAM_PREFIXES)]
+    query.sort()
+
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, urlencode(query), ''))
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response, as stored in the cache."""
+
+    def __init__(self, url, status_code, headers, content, from_cache=False, content_skipped=False, expired=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.from_cache = from_cache
+        self.content_skipped = content_skipped
+        self.expired = expired
+        # Cut-off bodies are never stored, so a cached body is always complete
+        self.truncated = False
+        # Set when a conditional request confirmed the stored body (304)
+        self.revalidated = False
+
+    def validators(self):
+        """Conditional request headers for this response ({} if it had no validators)."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of HTTP responses with TTL and LRU eviction."""
+
+    def __init__(self, cache_dir, ttl_seconds=7 * 24 * 3600, max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.entries_dir = os.path.join(cache_dir, 'entries')
+        self.bodies_dir = os.path.join(cache_dir, 'bodies')
+        os.makedirs(self.entries_dir, exist_ok=True)
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        # Normalized URLs stored or revalidated by this process; those need no conditional request
+        self._confirmed = set()
+
+    def _entry_path(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.entries_dir, key + '.json')
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.bodies_dir, body_hash)
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, url, revalidate=False):
+        """Return a CachedResponse for url, or None on a miss or expired entry.
+
+        With revalidate=True an expired entry is returned too, with `expired`
+        set, so it can be revalidated; so is an entry with validators that
+        this process has not stored or revalidated yet, however old it is.
+        Both count as misses.
+        """
+        entry_path = self._entry_path(url)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            expired = time.time() - entry['stored_at'] > self.ttl_seconds
+            if revalidate and not expired and entry['url'] not in self._confirmed:
+                headers = CaseInsensitiveDict(entry['headers'])
+                expired = bool(headers.get('ETag') or headers.get('Last-Modified'))
+            if expired:
+                self.misses += 1
+                if not revalidate:
+                    return None
+            with open(self._body_path(entry['body_sha256']), 'rb') as f:
+                content = f.read()
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+        if not expired:
+            self.hits += 1
+        return CachedResponse(entry['final_url'], entry['status_code'], entry['headers'], content,
+                              from_cache=True, content_skipped=entry.get('content_skipped', False), expired=expired)
+
+    def renew(self, url, not_modified):
+        """Mark the stored response for url as fresh again after a 304 answer.
+
+        Validator and caching headers sent with the 304 replace the stored ones.
+        """
+        entry_path = self._entry_path(url)
+        with self._lock:
+            try:
+                with open(entry_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return
+            headers = CaseInsensitiveDict(entry['headers'])
+            for name in REVALIDATION_HEADERS:
+                if not_modified.headers.get(name):
+                    headers[name] = not_modified.headers[name]
+            entry['headers'] = dict(headers)
+            entry['stored_at'] = time.time()
+            self._write_atomic(entry_path, json.dumps(entry).encode('utf-8'))
+            self._confirmed.add(entry['url'])
+            self.revalidations += 1
+
+    def put(self, url, response):
+        """Store a response (requests.Response or CachedResponse) for url."""
+        if response.status_code not in CACHEABLE_STATUS_CODES or getattr(response, 'truncated', False):
+            return
+
+        content = response.content or b''
+        body_hash = hashlib.sha256(content).hexdigest()
+        entry = {
+            'url': normalize_url(url),
+            'final_url': response.url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'body_sha256': body_hash,
+            'body_size': len(content),
+            'content_skipped': getattr(response, 'content_skipped', False),
+            'stored_at': time.time(),
+        }
+        entry_data = json.dumps(entry).encode('utf-8')
+
+        with self._lock:
+            body_path = self._body_path(body_hash)
+            entry_path = self._entry_path(url)
+            added = len(entry_data)
+            if os.path.exists(entry_path):
+                added -= os.path.getsize(entry_path)
+            if not os.path.exists(body_path):
+                self._write_atomic(body_path, content)
+                added += len(content)
+            self._write_atomic(entry_path, entry_data)
+            self._confirmed.add(entry['url'])
+
+            if self._total_bytes is not None:
+                self._total_bytes += added
+            if self.current_size() > self.max_bytes:
+                self._evict()
+
+    def current_size(self):
+        """Total bytes used by entries and bodies (computed once, then tracked)."""
+        if self._total_bytes is None:
+            total = 0
+            for directory in (self.entries_dir, self.bodies_dir):
+                for name in os.listdir(directory):
+                    try:
+                        total += os.path.getsize(os.path.join(directory, name))
+                    except OSError:
+                        pass
+            self._total_bytes = total
+        return self._total_bytes
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        body_refs = {}
+        for name in os.listdir(self.entries_dir):
+            path = os.path.join(self.entries_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    body_hash = json.load(f)['body_sha256']
+                entries.append((os.path.getmtime(path), path, body_hash))
+            except (OSError, ValueError, KeyError):
+                continue
+            body_refs[body_hash] = body_refs.get(body_hash, 0) + 1
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        for _, path, body_hash in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                self._total_bytes -= os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+
+            # Bodies are shared between entries; delete only the last reference
+            body_refs[body_hash] -= 1
+            if body_refs[body_hash] == 0:
+                body_path = self._body_path(body_hash)
+                try:
+                    self._total_bytes -= os.path.getsize(body_path)
+                    os.remove(body_path)
+                except OSError:
+                    pass
+
+        # Bodies left behind when an entry was overwritten with new content
+        for name in os.listdir(self.bodies_dir):
+            if body_refs.get(name, 0) == 0:
+                body_path = self._body_path(name)
+                try:
+                    self._total_bytes -= os.path.getsize(body_path)
+                    os.remove(body_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Remove every cached entry and body."""
+        with self._lock:
+            for directory in (self.entries_dir, self.bodies_dir):
+                for name in os.listdir(directory):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+            self._total_bytes = 0
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Return the shared cache configured from the environment, or None if disabled."""
+    global _default_cache
+    if os.getenv('URL_CACHE_ENABLED', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            cache_dir = os.getenv('URL_CACHE_DIR') or os.path.join(script_dir, '.url_cache')
+            ttl_hours = float(os.getenv('URL_CACHE_TTL_HOURS', '168'))
+            max_mb = float(os.getenv('URL_CACHE_MAX_MB', '500'))
+            _default_cache = ResponseCache(cache_dir, ttl_seconds=ttl_hours * 3600,
+                                           max_bytes=int(max_mb * 1024 * 1024))
+        return _default_cache
+
+
+def _cap(cached, max_bytes):
+    """Cut a cached body stored before the current size cap was set."""
+    if max_bytes is not None and len(cached.content) > max_bytes:
+        cached.content = cached.content[:max_bytes]
+        cached.truncated = True
+    return cached
+
+
+def cached_get(url, headers=None, timeout=15, cache=None, max_bytes=None, accept=None, enough=None):
+    """GET a URL through the shared response cache.
+
+    Behaves like requests.get(url, headers=headers, timeout=timeout,
+    allow_redirects=True) and raises the same exceptions on network errors.
+    Cache misses are downloaded with the run's pooled fetcher (http_fetcher),
+    which applies max_bytes, accept and enough; bodies cut off by those
+    limits are not cached. Entries with validators are revalidated once per
+    run (and expired ones without validators downloaded again); a 304
+    returns the stored response with `revalidated` set.
+    """
+    if cache is None:
+        cache = get_default_cache()
+
+    stale = None
+    if cache is not None:
+        cached = cache.get(url, revalidate=os.getenv('URL_REVALIDATE', '1') != '0')
+        if cached is not None and not cached.expired:
+            return _cap(cached, max_bytes)
+        if cached is not None and cached.validators():
+            stale = cached
+
+    request_headers = dict(headers or {})
+    if stale is not None:
+        request_headers.update(stale.validators())
+    response = get_default_fetcher().get(url, headers=request_headers, timeout=timeout, allow_redirects=True,
+                                         max_bytes=max_bytes, accept=accept, enough=enough)
+
+    if stale is not None and response.status_code == 304:
+        cache.renew(url, response)
+        stale.revalidated = True
+        return _cap(stale, max_bytes)
+
+    if cache is not None:
+        cache.put(url, response)
+
+    return response
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Fetcher
+Shared by the Filipino, Indian and Nigerian URL analyzers: every page that is
+not in the response cache (http_cache) is downloaded through one
+requests.Session per run, so the cited page and the about/contact pages of the
+same site reuse one kept-alive TCP/TLS connection instead of opening a new one
+for every request.
+
+The connection pool keeps up to URL_ANALYSIS_WORKERS connections per host
+(one per analysis thread). GETs that fail to connect, or that get a 429 or
+503 answer, are tried again up to URL_FETCH_RETRIES times (default 2) with
+jittered exponential backoff, starting at URL_FETCH_BACKOFF seconds (default
+1) and capped at URL_FETCH_BACKOFF_MAX seconds (default 30). A Retry-After
+header within that cap is honored instead.
+
+Bodies can be streamed instead of buffered whole: get() then stops reading
+at a byte cap or when an `enough` callback is satisfied (marking the response
+`truncated`), and skips bodies an `accept` callback rejects from their
+Content-Type and first bytes (marking it `content_skipped`).
+
+Cookies are not kept between requests, so one site never sees cookies set by
+an earlier request, exactly as with separate requests.get() calls.
+"""
+
+import http.cookiejar
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+
+# Answers that mean "try again later" rather than a final result
+RETRY_STATUS_CODES = {429, 503}
+
+# Bytes read from a streamed body at a time
+CHUNK_SIZE = 64 * 1024
+
+# Connection errors that will not go away by retrying (urllib3 2.x only)
+_NAME_RESOLUTION_ERROR = getattr(urllib3.exceptions, 'NameResolutionError', ())
+
+
+class _RejectAllCookies(http.cookiejar.DefaultCookiePolicy):
+    """Cookie policy that never stores a cookie in the session jar."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class PooledFetcher:
+    """requests.Session wrapper with a sized connection pool, retries and reuse statistics.
+
+    Args:
+        pool_size: Connections kept alive per host (match the number of threads fetching).
+        max_retries: Extra attempts after a connection error or a 429/503 answer.
+        backoff: Upper bound in seconds of the first retry delay; doubles per retry.
+        backoff_max: Largest delay in seconds between two attempts.
+        max_hosts: Number of per-host pools kept open at once.
+    """
+
+    def __init__(self, pool_size=4, max_retries=2, backoff=1.0, backoff_max=30.0, max_hosts=100):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._closed_pool_stats = {}
+        self._retries = {}
+
+        self.session = requests.Session()
+        self.session.cookies.set_policy(_RejectAllCookies())
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max(1, pool_size))
+        # Keep the counts of pools that are dropped to make room for new hosts
+        pools = adapter.poolmanager.pools
+        close_pool = pools.dispose_func  # None with urllib3 2, which leaves dropped pools to be collected
+        def dispose(pool):
+            self._record_pool(self._closed_pool_stats, pool)
+            if close_pool is not None:
+                close_pool(pool)
+        pools.dispose_func = dispose
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._adapter = adapter
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.strip().isdigit() and int(retry_after) <= self.backoff_max:
+                return float(retry_after)
+        # Full jitter: spreads out retries of threads that failed at the same moment
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _count_retry(self, url):
+        host = urlparse(url).hostname or ''
+        with self._lock:
+            self._retries[host] = self._retries.get(host, 0) + 1
+
+    @staticmethod
+    def _read_body(response, max_bytes, accept, enough):
+        """Read a streamed body up to the limits and store it as response.content."""
+        content = bytearray()
+        first_chunk = True
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if first_chunk and accept is not None and not accept(response.headers.get('Content-Type', ''), chunk):
+                    response.content_skipped = True
+                    break
+                first_chunk = False
+                if max_bytes is not None and len(content) + len(chunk) > max_bytes:
+                    content += chunk[:max_bytes - len(content)]
+                    response.truncated = True
+                    break
+                content += chunk
+                if enough is not None and enough(chunk):
+                    response.truncated = True
+                    break
+        finally:
+            # Drops the connection if the body was not read to the end
+            response.close()
+        response._content = bytes(content)
+
+    def get(self, url, headers=None, timeout=15, allow_redirects=True, max_bytes=None, accept=None, enough=None):
+        """GET a URL like requests.get(), retrying connection errors and 429/503 answers.
+
+        After the last attempt the 429/503 response is returned, or the
+        connection error raised, as requests.get() would have.
+
+        Args:
+            max_bytes: Largest body to read; longer bodies are cut off.
+            accept: Function (content_type, first_chunk) -> bool; bodies it
+                    rejects are not downloaded (content is empty).
+            enough: Function called with every chunk read; reading stops
+                    once it returns True.
+
+        The response gets `truncated` (body cut off by max_bytes or enough)
+        and `content_skipped` (body rejected by accept) attributes.
+        """
+        stream = max_bytes is not None or accept is not None or enough is not None
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout,
+                                            allow_redirects=allow_redirects, stream=stream)
+            except requests.exceptions.ConnectionError as e:
+                reason = getattr(e.args[0], 'reason', None) if e.args else None
+                if last_attempt or isinstance(reason, _NAME_RESOLUTION_ERROR):
+                    raise
+                delay = self._retry_delay(attempt)
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUS_CODES:
+                    response.truncated = False
+                    response.content_skipped = False
+                    if stream:
+                        self._read_body(response, max_bytes, accept, enough)
+                    return response
+                delay = self._retry_delay(attempt, response)
+                response.close()
+            self._count_retry(url)
+            time.sleep(delay)
+
+    @staticmethod
+    def _record_pool(stats, pool):
+        counts = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+        counts['requests'] += pool.num_requests
+        counts['connections'] += pool.num_connections
+
+    def host_stats(self):
+        """Return {host: {requests, connections, reused, retries}} for this run.
+
+        `requests` counts every attempt sent (redirects and retries included),
+        `connections` the connections opened for them, and `reused` the
+        requests that went over an already open connection.
+        """
+        with self._lock:
+            stats = {host: dict(counts) for host, counts in self._closed_pool_stats.items()}
+            retries = dict(self._retries)
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                self._record_pool(stats, pool)
+        for host, counts in stats.items():
+            counts['reused'] = max(0, counts['requests'] - counts['connections'])
+            counts['retries'] = retries.pop(host, 0)
+        for host, count in retries.items():
+            # Hosts whose every attempt failed before a connection was made
+            stats[host] = {'requests': 0, 'connections': 0, 'reused': 0, 'retries': count}
+        return stats
+
+    def summary(self):
+        """One-line summary of connection reuse and retries, or None if nothing was fetched."""
+        stats = self.host_stats()
+        totals = {field: sum(counts[field] for counts in stats.values())
+                  for field in ('requests', 'connections', 'reused', 'retries')}
+        if not totals['requests'] and not totals['retries']:
+            return None
+        return (f"{totals['requests']} requests to {len(stats)} hosts over {totals['connections']} "
+                f"connections ({totals['reused']} reused, {totals['retries']} retried)")
+
+    def close(self):
+        self.session.close()
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_default_fetcher():
+    """Return the run's shared fetcher, configured from the environment."""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = PooledFetcher(
+                pool_size=int(os.getenv('URL_ANALYSIS_WORKERS', '4')),
+                max_retries=int(os.getenv('URL_FETCH_RETRIES', '2')),
+                backoff=float(os.getenv('URL_FETCH_BACKOFF', '1')),
+                backoff_max=float(os.getenv('URL_FETCH_BACKOFF_MAX', '30')),
+            )
+        return _default_fetcher
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Multi-Keyword Matcher
+Finds every cultural-concept keyword (with its spelling variations), Western
+boundary keyword and definition/advice phrase of a region in one scan of the
+page text. The analyzers build one matcher per region at import time instead
+of running `keyword in text_lower` (and lowercasing the page again) for every
+keyword on every page.
+
+Backends:
+    pyahocorasick   Used when installed (pip install pyahocorasick): a real
+                    Aho-Corasick automaton, one pass over the text in C.
+    str.find        Pure-Python fallback: each distinct search string is
+                    looked for once with str.find. A per-character automaton
+                    written in Python was measured slower than this.
+"""
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordHits:
+    """What KeywordMatcher.scan() found in a text.
+
+    Attributes:
+        by_concept: {concept: [matched keywords]} in table order.
+        keywords: Every matched concept keyword in table order (a keyword
+                  listed under two concepts appears twice, as before).
+        groups: {group name: [matched phrases]} in table order.
+        positions: {search string: [start offsets]} for every search string
+                   found, as offsets into text.lower().
+    """
+
+    def __init__(self):
+        self.by_concept = {}
+        self.keywords = []
+        self.groups = {}
+        self.positions = {}
+
+
+class KeywordMatcher:
+    """Match a region's keyword tables against text in a single scan.
+
+    Args:
+        concepts: {concept: [keyword, ...]}. A keyword matches when it, or one
+                  of its variations, occurs in the lowercased text.
+        groups: {name: [phrase, ...]} of plain phrase lists matched the same
+                way (e.g. Western keywords, definition indicators).
+        variations: {lowercase keyword: [variation, ...]}; a keyword listed
+                    here matches on any of its variations instead of itself.
+        backend: 'pyahocorasick', 'str.find', or None to pick the fastest
+                 available.
+    """
+
+    def __init__(self, concepts, groups=None, variations=None, backend=None):
+        variations = variations or {}
+        search_strings = {}
+
+        def register(strings):
+            strings = tuple(s.lower() for s in strings)
+            for s in strings:
+                search_strings[s] = None
+            return strings
+
+        self._concepts = []
+        for concept, keywords in concepts.items():
+            entries = []
+            for keyword in keywords:
+                keyword_lower = keyword.lower()
+                entries.append((keyword, register(variations.get(keyword_lower, [keyword_lower]))))
+            self._concepts.append((concept, entries))
+
+        self._groups = []
+        for name, phrases in (groups or {}).items():
+            self._groups.append((name, [(phrase, register([phrase])) for phrase in phrases]))
+
+        self._search_strings = list(search_strings)
+
+        if backend is None:
+            backend = 'pyahocorasick' if ahocorasick is not None else 'str.find'
+        if backend == 'pyahocorasick':
+            if ahocorasick is None:
+                raise ImportError("pyahocorasick is not installed")
+            self._automaton = ahocorasick.Automaton()
+            for s in self._search_strings:
+                if s:
+                    self._automaton.add_word(s, s)
+            self._automaton.make_automaton()
+        elif backend != 'str.find':
+            raise ValueError(f"Unknown keyword matcher backend: {backend}")
+        self.backend = backend
+
+    def _find_positions(self, text_lower):
+        positions = {}
+        if self.backend == 'pyahocorasick':
+            for end, s in self._automaton.iter(text_lower):
+                positions.setdefault(s, []).append(end - len(s) + 1)
+            if '' in self._search_strings:
+                positions[''] = [0]
+            return positions
+
+        for s in self._search_strings:
+            start = text_lower.find(s)
+            while start != -1:
+                positions.setdefault(s, []).append(start)
+                if not s:
+                    break
+                start = text_lower.find(s, start + 1)
+        return positions
+
+    def scan(self, text):
+        """Return the KeywordHits for text (case-insensitive)."""
+        hits = KeywordHits()
+        hits.positions = positions = self._find_positions(text.lower())
+
+        for concept, entries in self._concepts:
+            matched = [keyword for keyword, strings in entries
+                       if any(s in positions for s in strings)]
+            if matched:
+                hits.by_concept[concept] = matched
+                hits.keywords.extend(matched)
+
+        for name, entries in self._groups:
+            hits.groups[name] = [phrase for phrase, strings in entries
+                                 if any(s in positions for s in strings)]
+
+        return hits
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+Keeps the results of chat.completions.create and responses.create on disk, so
+a region can be run again (e.g. to tweak the analyzer's keyword lists)
+without asking OpenAI again, and offline.
+
+LLM_CACHE_MODE selects what the threaded and async collectors do:
+    bypass   The cache is not used (default)
+    record   Every request is sent to OpenAI and its response stored,
+             replacing an earlier one
+    replay   Responses come from the cache only; a request that is not in
+             it fails like an API error would (LLMCacheMiss)
+
+Entries live in LLM_CACHE_DIR (default .llm_cache next to the scripts), one
+file per request:
+    <sha256 of endpoint, request and sample>.json
+The request is the whole request body (model, messages or input, tools and
+sampling parameters), so changing any of them is a miss. Sessions after the
+first send the same requests on purpose, to sample different answers, so the
+session number is part of the key as the "sample" (see sample()).
+
+Batch API runs keep their own results in --batch-dir and do not use the
+cache.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+MODES = ('bypass', 'record', 'replay')
+
+# Number of the answer a request is asking for (the session number)
+_sample = contextvars.ContextVar('llm_cache_sample', default=0)
+
+
+class LLMCacheMiss(Exception):
+    """A request was not found in the cache in replay mode."""
+
+
+@contextlib.contextmanager
+def sample(number):
+    """Key the requests sent inside this block (thread or task) as answer `number`."""
+    token = _sample.set(number)
+    try:
+        yield
+    finally:
+        _sample.reset(token)
+
+
+def _response_model(endpoint):
+    from openai.types.chat import ChatCompletion
+    from openai.types.responses import Response
+    return {'chat.completions': ChatCompletion, 'responses': Response}[endpoint]
+
+
+class LLMCache:
+    """On-disk cache of OpenAI responses, keyed by endpoint, request body and sample.
+
+    Args:
+        directory: Directory of the cache entries.
+        mode: 'record' or 'replay' (see the module docstring).
+    """
+
+    def __init__(self, directory, mode):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"LLM cache mode must be 'record' or 'replay', not {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.recorded = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint, request, sample_number):
+        data = json.dumps({'endpoint': endpoint, 'request': request, 'sample': sample_number},
+                          sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _path(self, endpoint, request, sample_number):
+        return os.path.join(self.directory, self.key(endpoint, request, sample_number) + '.json')
+
+    def get(self, endpoint, request):
+        """Return the stored response to this request (as the SDK returns it), or None."""
+        try:
+            with open(self._path(endpoint, request, _sample.get()), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self.hits += 1
+        # Same object the client returns, built without validation like batch results
+        return _response_model(endpoint).construct(**entry['response'])
+
+    def put(self, endpoint, request, response):
+        """Store the response to a request."""
+        sample_number = _sample.get()
+        data = json.dumps({
+            'endpoint': endpoint,
+            'sample': sample_number,
+            'request': request,
+            'response': response.to_dict(),
+        }, indent=2, ensure_ascii=False).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(endpoint, request, sample_number))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.recorded += 1
+
+    def _replay(self, endpoint, request):
+        response = self.get(endpoint, request)
+        if response is None:
+            raise LLMCacheMiss(f"{endpoint} request not in the LLM cache ({self.directory}, "
+                               f"sample {_sample.get()}); record it first with LLM_CACHE_MODE=record")
+        return response
+
+    def call(self, endpoint, create, request):
+        """Return create(**request) in record mode, or its stored response in replay mode."""
+        if self.mode == 'replay':
+            return self._replay(endpoint, request)
+        response = create(**request)
+        self.put(endpoint, request, response)
+        return response
+
+    async def call_async(self, endpoint, create, request):
+        """Async call(): awaits create(**request) unless replaying."""
+        if self.mode == 'replay':
+            return self._replay(endpoint, request)
+        response = await create(**request)
+        self.put(endpoint, request, response)
+        return response
+
+    def summary(self):
+        """One-line summary of this run's cache use."""
+        if self.mode == 'replay':
+            return f"{self.hits} responses replayed from {self.directory}"
+        return f"{self.recorded} responses recorded to {self.directory}"
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_llm_cache():
+    """Return the cache configured from the environment, or None in bypass mode."""
+    global _default_cache
+    mode = os.getenv('LLM_CACHE_MODE', 'bypass').strip().lower() or 'bypass'
+    if mode not in MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+    if mode == 'bypass':
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            cache_dir = os.getenv('LLM_CACHE_DIR') or os.path.join(script_dir, '.llm_cache')
+            _default_cache = LLMCache(cache_dir, mode)
+        return _default_cache
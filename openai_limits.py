@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+OpenAI Rate Limits and Usage Ledger
+Shared by the Filipino, Indian and Nigerian collectors (threaded, async and
+first-session turns alike).
+
+RateLimiter keeps every OpenAI request of a process within
+OPENAI_REQUESTS_PER_MINUTE (default 500) and OPENAI_TOKENS_PER_MINUTE
+(default 30000; 0 turns a limit off). A request reserves one request slot and
+an estimate of its tokens before it is sent; the estimate is corrected with
+the token counts of the response. A 429 answer pauses all requests and the
+request is sent again (up to OPENAI_RATE_LIMIT_RETRIES times, default 6)
+instead of dropping the turn; a 429 for an exhausted quota is raised at once.
+
+UsageLedger collects the prompt and completion tokens of every turn, by
+session and step (advice / search), for the "usage" block of the results JSON,
+including the prompt tokens the provider's prompt cache served (cached_tokens).
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+import openai
+
+from llm_cache import get_default_llm_cache
+
+# Output tokens reserved for a request before its real usage is known
+ADVICE_OUTPUT_TOKENS = 1000
+SEARCH_OUTPUT_TOKENS = 1500
+
+# Rough number of characters per token, for estimating prompt sizes
+CHARS_PER_TOKEN = 4
+
+# Longest single wait before the limits are checked again (a finished request
+# may have handed back part of its reservation in the meantime)
+MAX_WAIT_STEP = 1.0
+
+# Longest pause after a 429 without a Retry-After header
+MAX_RATE_LIMIT_BACKOFF = 60.0
+
+
+def estimate_tokens(request, output_tokens):
+    """Rough token count of a request: its prompt size plus the output allowance."""
+    return len(json.dumps(request, ensure_ascii=False)) // CHARS_PER_TOKEN + output_tokens
+
+
+def _field(source, *names):
+    """First of the named fields set on an SDK object or dict, or None."""
+    for name in names:
+        value = source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def token_counts(usage):
+    """{prompt_tokens, completion_tokens, cached_tokens} of a chat.completions or responses usage.
+
+    `usage` is the SDK object or a dict, either as the API returns it or as
+    returned here. cached_tokens are the prompt tokens served from the
+    provider's prompt cache.
+    """
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+    cached_tokens = _field(usage, "cached_tokens")
+    if cached_tokens is None:
+        details = _field(usage, "prompt_tokens_details", "input_tokens_details")
+        cached_tokens = _field(details, "cached_tokens") if details is not None else None
+
+    return {
+        "prompt_tokens": _field(usage, "prompt_tokens", "input_tokens") or 0,
+        "completion_tokens": _field(usage, "completion_tokens", "output_tokens") or 0,
+        "cached_tokens": cached_tokens or 0,
+    }
+
+
+def _total_tokens(response):
+    counts = token_counts(getattr(response, 'usage', None))
+    total = counts["prompt_tokens"] + counts["completion_tokens"]
+    return total or None
+
+
+def _is_quota_error(error):
+    """429s for an exhausted quota or billing limit do not go away by waiting."""
+    return getattr(error, 'code', None) == 'insufficient_quota'
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by threads and coroutines.
+
+    Args:
+        requests_per_minute: Defaults to OPENAI_REQUESTS_PER_MINUTE (500); 0 = no limit.
+        tokens_per_minute: Defaults to OPENAI_TOKENS_PER_MINUTE (30000); 0 = no limit.
+        max_retries: Times a request is sent again after a 429. Defaults to
+                     OPENAI_RATE_LIMIT_RETRIES (6).
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=None):
+        if requests_per_minute is None:
+            requests_per_minute = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+        if tokens_per_minute is None:
+            tokens_per_minute = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000"))
+        if max_retries is None:
+            max_retries = int(os.getenv("OPENAI_RATE_LIMIT_RETRIES", "6"))
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.rate_limited = 0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _reserve(self, tokens):
+        """Reserve one request and `tokens` if they fit now; otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            waits = [0.0]
+            if self.requests_per_minute and self._requests < 1:
+                waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                tokens = min(tokens, self.tokens_per_minute)
+                if self._tokens < tokens:
+                    waits.append((tokens - self._tokens) * 60 / self.tokens_per_minute)
+            if max(waits) > 0:
+                return max(waits)
+            self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0
+
+    def settle(self, reserved, used):
+        """Correct a token reservation with the tokens the request actually used."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens_per_minute:
+                self._tokens -= used - min(reserved, self.tokens_per_minute)
+
+    def _back_off(self, attempt, error):
+        """Pause all requests after a 429, or re-raise it when retrying will not help."""
+        if attempt == self.max_retries or _is_quota_error(error):
+            raise error
+        delay = None
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            try:
+                delay = float(retry_after) if retry_after else None
+            except ValueError:
+                delay = None
+        if delay is None:
+            delay = random.uniform(0.5, 1.0) * min(MAX_RATE_LIMIT_BACKOFF, 2 ** (attempt + 1))
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.rate_limited += 1
+        print(f"  ⚠️  OpenAI rate limit hit, retrying in {delay:.1f}s")
+
+    def call(self, create, request, output_tokens):
+        """Send create(**request) within the limits, retrying 429s; return the response."""
+        reserved = estimate_tokens(request, output_tokens)
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(reserved)
+            while wait > 0:
+                time.sleep(min(wait, MAX_WAIT_STEP))
+                wait = self._reserve(reserved)
+            try:
+                response = create(**request)
+            except openai.RateLimitError as e:
+                self.settle(reserved, 0)
+                self._back_off(attempt, e)
+                continue
+            except Exception:
+                # Failed requests are not charged in full; count the prompt only
+                self.settle(reserved, reserved - output_tokens)
+                raise
+            self.settle(reserved, _total_tokens(response) or reserved)
+            return response
+
+    async def call_async(self, create, request, output_tokens):
+        """Async call(): awaits create(**request) within the limits, retrying 429s."""
+        reserved = estimate_tokens(request, output_tokens)
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(reserved)
+            while wait > 0:
+                await asyncio.sleep(min(wait, MAX_WAIT_STEP))
+                wait = self._reserve(reserved)
+            try:
+                response = await create(**request)
+            except openai.RateLimitError as e:
+                self.settle(reserved, 0)
+                self._back_off(attempt, e)
+                continue
+            except Exception:
+                self.settle(reserved, reserved - output_tokens)
+                raise
+            self.settle(reserved, _total_tokens(response) or reserved)
+            return response
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_limiter():
+    """Return the limiter shared by every OpenAI request of this process."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
+
+
+class _LimitedEndpoint:
+    def __init__(self, endpoint, create, limiter, output_tokens, cache):
+        self._endpoint = endpoint
+        self._create = create
+        self._limiter = limiter
+        self._output_tokens = output_tokens
+        self._cache = cache
+
+    def _send(self, **request):
+        return self._limiter.call(self._create, request, self._output_tokens)
+
+    def create(self, **request):
+        if self._cache is not None:
+            return self._cache.call(self._endpoint, self._send, request)
+        return self._send(**request)
+
+
+class _LimitedChat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class LimitedClient:
+    """OpenAI client whose chat.completions.create and responses.create go through a RateLimiter.
+
+    Responses are recorded to or replayed from the LLM cache (llm_cache) when
+    LLM_CACHE_MODE asks for it; replayed requests do not count against the
+    limits. Everything else (files, batches, ...) is passed through to the
+    client.
+    """
+
+    def __init__(self, client, limiter=None):
+        self._client = client
+        self.limiter = limiter or get_default_limiter()
+        self.cache = get_default_llm_cache()
+        self.chat = _LimitedChat(_LimitedEndpoint('chat.completions', client.chat.completions.create,
+                                                  self.limiter, ADVICE_OUTPUT_TOKENS, self.cache))
+        self.responses = _LimitedEndpoint('responses', client.responses.create, self.limiter,
+                                          SEARCH_OUTPUT_TOKENS, self.cache)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class UsageLedger:
+    """Prompt and completion tokens of one region's run, per session, turn and step.
+
+    Args:
+        region: Region name, recorded in the ledger.
+    """
+
+    def __init__(self, region):
+        self.region = region
+        self._lock = threading.Lock()
+        self._turns = {}
+        self._timings = {}
+
+    def record(self, session, turn_number, usage, timings=None):
+        """Store the usage of a turn: {step: {prompt_tokens, completion_tokens}} (steps: advice, search).
+
+        `timings` are the turn's timing_spans ({span: {ms, calls}}), if it was timed.
+        """
+        with self._lock:
+            self._turns[(session, turn_number)] = {step: token_counts(counts) for step, counts in usage.items()}
+            if timings is not None:
+                self._timings[(session, turn_number)] = timings
+
+    def to_json(self):
+        """The "usage" block of the results JSON: totals, per session and per turn."""
+        with self._lock:
+            turns = sorted(self._turns.items())
+
+        def add(total, counts):
+            total["requests"] += 1
+            for field in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+                total[field] += counts[field]
+
+        def new_total():
+            return {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+        totals = new_total()
+        by_session = {}
+        turn_records = []
+        for (session, turn_number), steps in turns:
+            session_total = by_session.setdefault(str(session), new_total())
+            for counts in steps.values():
+                add(totals, counts)
+                add(session_total, counts)
+            turn_records.append({"session": session, "turn_number": turn_number, **steps})
+
+        return {
+            "region": self.region,
+            "totals": totals,
+            "by_session": by_session,
+            "turns": turn_records,
+        }
+
+    def turn_timings(self):
+        """[{session, turn_number, <span>: {ms, calls}}] of the timed turns, for the results' timings block."""
+        with self._lock:
+            timings = sorted(self._timings.items())
+        return [{"session": session, "turn_number": turn_number, **spans}
+                for (session, turn_number), spans in timings]
+
+    def summary(self):
+        """One-line summary of the run's token usage."""
+        totals = self.to_json()["totals"]
+        return (f"{totals['requests']} requests, {totals['prompt_tokens']} prompt tokens "
+                f"({totals['cached_tokens']} from the prompt cache), "
+                f"{totals['completion_tokens']} completion tokens")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Parsed Page Document
+One BeautifulSoup parse per downloaded page, shared by the location and
+cultural-context detectors of the URL analyzers. The full text, footer text
+and about/contact link list are computed on first use and cached, instead of
+each detector calling soup.get_text() and find_all() again.
+
+The HTML parser is chosen with HTML_PARSER (html.parser by default, or lxml /
+html5lib / auto when installed). Different parsers can build slightly
+different trees from broken HTML, so results are only comparable between runs
+that used the same parser.
+"""
+
+import importlib.util
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+
+# Parsers BeautifulSoup can use, and the module each one needs
+PARSER_MODULES = {
+    'html.parser': None,
+    'lxml': 'lxml',
+    'html5lib': 'html5lib',
+}
+
+# Links worth following to find where a site is based
+INFO_LINK_PATTERN = re.compile(r'about|contact|terms|privacy|legal', re.I)
+
+# Share of the text (from the end) used as the footer when a page has no footer element
+FOOTER_FALLBACK_FRACTION = 0.8
+
+# Content types parsed as pages; anything else (PDF, images, media) is not downloaded
+TEXT_CONTENT_TYPES = ('application/xhtml+xml', 'application/xml')
+
+# Content types that say nothing about the body, so its first bytes decide
+GENERIC_CONTENT_TYPES = ('', 'application/octet-stream', 'binary/octet-stream')
+
+# Leading bytes of common binary files (PDF, PNG, GIF, JPEG, ZIP/Office, gzip, MP3, MP4, RIFF, Ogg)
+BINARY_SIGNATURES = (b'%PDF', b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'PK\x03\x04', b'\x1f\x8b',
+                     b'ID3', b'\x00\x00\x00', b'RIFF', b'OggS')
+
+TAG_DELIMITER = re.compile(rb'([<>])')
+
+_warned_parsers = set()
+
+
+def parser_available(parser):
+    """Return True if BeautifulSoup can use the given parser here."""
+    if parser not in PARSER_MODULES:
+        return False
+    module = PARSER_MODULES[parser]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def resolve_parser(parser=None):
+    """Return the parser to use: the argument, else HTML_PARSER, else html.parser.
+
+    'auto' picks lxml when it is installed. A parser that is not installed
+    falls back to html.parser with a one-time warning.
+    """
+    parser = parser or os.getenv('HTML_PARSER') or 'html.parser'
+    if parser == 'auto':
+        return 'lxml' if parser_available('lxml') else 'html.parser'
+    if not parser_available(parser):
+        if parser not in _warned_parsers:
+            _warned_parsers.add(parser)
+            print(f"⚠️  HTML parser '{parser}' is not available, using html.parser")
+        return 'html.parser'
+    return parser
+
+
+def is_text_content(content_type, head):
+    """Return True if a response is an HTML (or other text) page worth parsing.
+
+    Args:
+        content_type: Value of the Content-Type header ('' if missing).
+        head: First bytes of the body, checked when the header is missing
+              or generic.
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type not in GENERIC_CONTENT_TYPES:
+        return media_type.startswith('text/') or media_type in TEXT_CONTENT_TYPES
+    return not head.lstrip().startswith(BINARY_SIGNATURES)
+
+
+class TextBudget:
+    """Download callback that reports when a page has delivered `limit` characters of text.
+
+    Called with each downloaded chunk of HTML; counts the non-blank
+    characters outside of tags (script and style contents included, so it
+    is an estimate) and returns True once the limit is reached.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.seen = 0
+        self._in_tag = False
+
+    def __call__(self, chunk):
+        for part in TAG_DELIMITER.split(chunk):
+            if part == b'<':
+                self._in_tag = True
+            elif part == b'>':
+                self._in_tag = False
+            elif not self._in_tag:
+                self.seen += len(part.strip())
+        return self.seen >= self.limit
+
+
+def _has_footer_marker(value):
+    return bool(value) and 'footer' in value.lower()
+
+
+class PageDocument:
+    """A downloaded HTML page, parsed once.
+
+    Args:
+        content: Raw HTML (bytes or str).
+        url: Final URL of the page, used to resolve relative links.
+        parser: BeautifulSoup parser name; see resolve_parser().
+    """
+
+    def __init__(self, content, url=None, parser=None):
+        self.url = url
+        self.parser = resolve_parser(parser)
+        self.soup = BeautifulSoup(content, self.parser)
+        self._text = None
+        self._footer_elements = None
+        self._footer_texts = {}
+        self._info_links = None
+
+    @property
+    def text(self):
+        """Full page text (soup.get_text()), computed once."""
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+    @property
+    def footer_elements(self):
+        """(footer tag or None, div/sections with 'footer' in a class, ... in the id), in document order."""
+        if self._footer_elements is None:
+            by_class = []
+            by_id = []
+            # One walk over the tree instead of a find_all() per attribute
+            for tag in self.soup.find_all(['div', 'section']):
+                classes = tag.get('class') or []
+                if isinstance(classes, str):
+                    classes = [classes]
+                if any(_has_footer_marker(c) for c in classes):
+                    by_class.append(tag)
+                if _has_footer_marker(tag.get('id')):
+                    by_id.append(tag)
+            self._footer_elements = (self.soup.find('footer'), by_class, by_id)
+        return self._footer_elements
+
+    def footer_text(self, first_only=False):
+        """Text of the page footer, computed once per mode.
+
+        Uses the <footer> element and the div/sections whose class (or, if
+        none, id) mentions 'footer'; all of them joined, or only the first
+        one found with first_only=True. Pages without any footer fall back
+        to the last 20% of the text lines.
+        """
+        if first_only not in self._footer_texts:
+            footer, by_class, by_id = self.footer_elements
+            if first_only:
+                first = footer or (by_class or by_id or [None])[0]
+                texts = [first.get_text()] if first else []
+            else:
+                texts = [footer.get_text()] if footer else []
+                texts.extend(tag.get_text() for tag in by_class or by_id)
+
+            if texts:
+                footer_text = '\n'.join(texts)
+            else:
+                text_lines = self.text.split('\n')
+                footer_start = int(len(text_lines) * FOOTER_FALLBACK_FRACTION)
+                footer_text = '\n'.join(text_lines[footer_start:])
+            self._footer_texts[first_only] = footer_text
+        return self._footer_texts[first_only]
+
+    @property
+    def info_links(self):
+        """<a> tags whose href mentions about/contact/terms/privacy/legal, in document order."""
+        if self._info_links is None:
+            self._info_links = self.soup.find_all('a', href=INFO_LINK_PATTERN)
+        return self._info_links
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Progress Events
+Structured progress of a region's URL analysis, for the visualization server
+to stream to the page (start_server_fixs.py, /api/progress) while the run is
+still going. The region runs and the server are separate processes, so the
+events go through one JSONL file per region:
+    .progress/<region>.jsonl
+Each run starts a new file and appends one line per event, flushed right
+away:
+    run_started    urls (distinct URLs), pending (left to analyze), resumed
+    url_started    url, turn_number (a worker started on it)
+    url_finished   url, turn_number, index / pending, urls_done (resumed ones
+                   included), status, country, cultural_context, and
+                   aggregates: the visualization payload of the region
+                   (visualization_payload.py) over every URL analyzed so far
+    run_finished   output_file, total_urls, aggregates of the final results
+Every event also has seq (1, 2, ... within the run), time, region and context
+(the visualization's name of the region). The file is kept after the run, so
+a page opened later sees that it finished.
+
+Set PROGRESS_ENABLED=0 to turn the events off, and PROGRESS_DIR to keep the
+files somewhere other than .progress/ next to the scripts.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from visualization_payload import CONTEXT_REGIONS, context_payload
+
+# Visualization context of each region
+REGION_CONTEXTS = {region: context for context, region in CONTEXT_REGIONS.items()}
+
+
+def progress_dir():
+    """Directory of the progress files."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.getenv('PROGRESS_DIR') or os.path.join(script_dir, '.progress')
+
+
+def progress_path(region):
+    """Return the progress file of a region, or None when progress events are off."""
+    if os.getenv('PROGRESS_ENABLED', '1') == '0':
+        return None
+    return os.path.join(progress_dir(), f'{region}.jsonl')
+
+
+class ProgressPublisher:
+    """Appends a run's progress events to a region's progress file.
+
+    Args:
+        region: Region name (indian, nigerian, filipino).
+        path: Progress file. None publishes nothing.
+    """
+
+    def __init__(self, region, path):
+        self.region = region
+        self.context = REGION_CONTEXTS.get(region)
+        self.path = path
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._file = None
+        self._results = []
+
+    def _open(self):
+        # A new file replaces the last run's at once, so a reader never sees both
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.jsonl')
+        self._file = os.fdopen(fd, 'a', encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def publish(self, event, **fields):
+        """Append one event."""
+        if self.path is None:
+            return
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._seq += 1
+            record = {'seq': self._seq, 'time': round(time.time(), 3), 'event': event,
+                      'region': self.region, 'context': self.context, **fields}
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def _aggregates(self, results):
+        if self.context is None:
+            return None
+        return context_payload(self.context, results)
+
+    def run_started(self, urls, pending, resumed_results):
+        self._results = list(resumed_results)
+        self.publish('run_started', urls=urls, pending=pending, resumed=len(self._results))
+
+    def url_started(self, url, turn_number):
+        self.publish('url_started', url=url, turn_number=turn_number)
+
+    def url_finished(self, index, pending, url, result):
+        if self.path is None:
+            return
+        self._results.append(result)
+        self.publish('url_finished', url=url, turn_number=result.get('turn_number'), index=index, pending=pending,
+                     urls_done=len(self._results), status=result['status'], country=result['country'],
+                     cultural_context=result['cultural_context'], aggregates=self._aggregates(self._results))
+
+    def run_finished(self, output_file, results):
+        self.publish('run_finished', output_file=output_file, total_urls=len(results),
+                     aggregates=self._aggregates(results))
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ProgressTail:
+    """Reads the events a region's progress file gains, following it across runs.
+
+    Args:
+        path: Progress file (it may not exist yet).
+        skip_finished: Leave out the events already in the file if that run
+                       has finished, so a new reader only sees runs in progress.
+    """
+
+    def __init__(self, path, skip_finished=True):
+        self.path = path
+        self._inode = None
+        self._offset = 0
+        self._partial = b''
+        self._backlog = self._read()
+        if skip_finished and self._backlog and self._backlog[-1]['event'] == 'run_finished':
+            self._backlog = []
+
+    def _read(self):
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return []
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode:
+                # A new run replaced the file
+                self._inode = stat.st_ino
+                self._offset = 0
+                self._partial = b''
+            if stat.st_size <= self._offset:
+                return []
+            f.seek(self._offset)
+            data = f.read()
+        self._offset += len(data)
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()  # Not complete yet
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def read(self):
+        """Events added since the last read."""
+        events, self._backlog = self._backlog + self._read(), []
+        return events
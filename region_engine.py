@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+"""
+Region Analysis Engine
+One implementation of the URL analysis (location + cultural context) shared
+by every region. The Filipino, Indian and Nigerian analyzer modules used to be
+three copies of the same ~1,000 lines; they now only hold their region's data
+(concept keywords, indicator phrases, known domains, TLDs, address and phone
+rules) in a RegionDefinition, and RegionAnalyzer builds the compiled matchers,
+tries and regexes from it once per process.
+
+The registry maps region names to their analyzer modules, so a caller such as
+cli.py can get every region's analyzer in one interpreter with get_region().
+The on-disk page cache (http_cache) is shared by all regions; the per-site
+location memo stays per region, because the address and phone rules that
+produce it differ between regions.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import re
+import requests
+from urllib.parse import urlparse, urljoin
+from concurrent_analysis import analyze_in_order
+from http_cache import cached_get, get_default_cache
+from http_fetcher import get_default_fetcher
+from domain_geo_memo import DomainGeoMemo
+from domain_trie import build_known_domain_trie, build_tld_trie, FirstListedSubstring
+from regex_bank import CountryScanner, compile_patterns
+from keyword_matcher import KeywordMatcher
+from page_document import PageDocument, TextBudget, is_text_content
+from checkpoint_journal import CheckpointJournal
+from analysis_store import AnalysisStore
+from results_summary import summarize, write_results
+from progress_events import ProgressPublisher
+from timing_spans import print_timings, recording, span, timings_block
+
+
+# Region name -> module holding its RegionDefinition (REGION) and analyzer (ENGINE)
+REGION_MODULES = {
+    "filipino": "filipino_url_analyzer",
+    "indian": "Indian_url_analyzer",
+    "nigerian": "nigerian_url_analyzer",
+}
+
+# US/Canada phone formats, listed first in every region's phone patterns
+US_CANADA_PHONE_PATTERNS = [
+    r'\+1[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4}',
+    r'\(\d{3}\)[\s\-]?\d{3}[\s\-]?\d{4}',
+    r'\d{3}[\s\-]\d{3}[\s\-]\d{4}',
+    r'\(\+1\)',
+    r'Tel:\s*\+1',
+]
+
+INFO_PAGE_KEYWORDS = ['about', 'contact', 'terms', 'privacy', 'legal']
+
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+INFO_PAGE_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+
+def page_download_limits():
+    """Return (max_bytes, text_limit) for page downloads, read from the environment.
+
+    URL_MAX_PAGE_BYTES caps every downloaded page (default 5 MB).
+    URL_PAGE_TEXT_LIMIT, when set, stops reading a cited page once about
+    that many characters of text have arrived (default 0: read the whole page).
+    """
+    max_bytes = int(float(os.getenv('URL_MAX_PAGE_BYTES', str(5 * 1024 * 1024))))
+    text_limit = int(os.getenv('URL_PAGE_TEXT_LIMIT', '0'))
+    return max_bytes or None, text_limit
+
+
+# Modules whose code decides a URL's analysis result
+ANALYSIS_CODE_MODULES = ('region_engine', 'page_document', 'keyword_matcher', 'regex_bank',
+                         'domain_trie', 'domain_geo_memo')
+
+
+def _fingerprint_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return repr(value)
+
+
+def analysis_fingerprint(region):
+    """Hash of the analysis code and the region's data, identifying stored results that are still valid."""
+    digest = hashlib.sha256()
+    for name in ANALYSIS_CODE_MODULES:
+        with open(importlib.import_module(name).__file__, 'rb') as f:
+            digest.update(f.read())
+    digest.update(json.dumps(vars(region), sort_keys=True, default=_fingerprint_default).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class RegionDefinition:
+    """The data that makes one region's analysis different from another's.
+
+    Args:
+        name: Registry name of the region ('indian'); also used in file names.
+        label: Adjective used in messages ('Indian').
+        concepts: {concept: [keyword, ...]} of the region's cultural concepts.
+        specific_concepts: Concepts that only occur in content about the
+                           region itself (e.g. 'barangay', 'wbcs').
+        defining_concepts: Concepts that, with definition language and at most
+                           two concepts overall, make a page 'defines_practice'.
+                           Defaults to specific_concepts.
+        definition_indicators: Phrases of definition-style articles.
+        advice_indicators: Phrases of advice-style articles (optional).
+        western_keywords: Western boundary/independence keywords, tracked
+                          separately from the concepts.
+        keyword_variations: {lowercase keyword: [variation, ...]}.
+        known_domain_tables: [(country, evidence label, domains, match subdomains)]
+                             in the order they are checked.
+        country_tlds: {tld: country} in the order they are checked.
+        us_states: US state names looked for in domain names.
+        phone_patterns: {country: [regex, ...]} in report order. 'US/Canada'
+                        counts for both countries.
+        split_us_canada_phone: Score a US/Canada phone number as half a point
+                               for each country instead of a full one for both.
+        address_location_indicators: {country: [regex, ...]}; the first
+                                     country listed wins.
+        address_flags: re flags for the address location indicators.
+        zip_patterns: {country: postal code regex} in the order they are checked.
+        zip_rules: {country: rule} saying when a postal code makes an address:
+                   'always', 'location' (the same country is mentioned nearby)
+                   or 'location_or_none' (the same country, or no known
+                   location at all). None selects mention-based addresses: a
+                   line near a mention of a listed country, plus that country's
+                   postal code when zip_patterns has one.
+        countries_without_standard_postal: Countries where a short street-level
+                                           line with a city counts without a
+                                           postal code (zip_rules mode only).
+        street_indicator_pattern: Regex of street words for those countries.
+        max_address_line: Longest line (and neighbouring line) used for addresses.
+        footer_first_only: Use only the first footer element of a page instead
+                           of all of them.
+        dedupe_info_links: Fetch each about/contact URL once per site even
+                           when several links point to it.
+        info_fallback_paths: Paths tried on the site root when fewer than three
+                             linked info pages could be read.
+        expired_domains: {URL substring: name} of servers known to be gone;
+                         such URLs are not fetched.
+        priority_countries: Countries listed first in the summary.
+    """
+
+    def __init__(self, name, label, concepts, specific_concepts, definition_indicators,
+                 western_keywords, keyword_variations, known_domain_tables, country_tlds,
+                 us_states, phone_patterns, address_location_indicators, zip_patterns,
+                 priority_countries, defining_concepts=None, advice_indicators=None,
+                 split_us_canada_phone=True, address_flags=re.IGNORECASE, zip_rules=None,
+                 countries_without_standard_postal=(), street_indicator_pattern=None,
+                 max_address_line=150, footer_first_only=False, dedupe_info_links=False,
+                 info_fallback_paths=(), expired_domains=None):
+        self.name = name
+        self.label = label
+        self.concepts = concepts
+        self.specific_concepts = list(specific_concepts)
+        self.defining_concepts = list(defining_concepts if defining_concepts is not None else specific_concepts)
+        self.definition_indicators = definition_indicators
+        self.advice_indicators = advice_indicators
+        self.western_keywords = western_keywords
+        self.keyword_variations = keyword_variations
+        self.known_domain_tables = known_domain_tables
+        self.country_tlds = country_tlds
+        self.us_states = us_states
+        self.phone_patterns = phone_patterns
+        self.split_us_canada_phone = split_us_canada_phone
+        self.address_location_indicators = address_location_indicators
+        self.address_flags = address_flags
+        self.zip_patterns = zip_patterns
+        self.zip_rules = zip_rules
+        self.countries_without_standard_postal = list(countries_without_standard_postal)
+        self.street_indicator_pattern = street_indicator_pattern
+        self.max_address_line = max_address_line
+        self.footer_first_only = footer_first_only
+        self.dedupe_info_links = dedupe_info_links
+        self.info_fallback_paths = list(info_fallback_paths)
+        self.expired_domains = expired_domains or {}
+        self.priority_countries = priority_countries
+
+
+class RegionAnalyzer:
+    """URL analysis for one region, with its matchers compiled once.
+
+    Args:
+        region: The RegionDefinition to analyze for.
+    """
+
+    def __init__(self, region):
+        self.region = region
+
+        groups = {'western': region.western_keywords, 'definition': region.definition_indicators}
+        if region.advice_indicators is not None:
+            groups['advice'] = region.advice_indicators
+        self.keyword_matcher = KeywordMatcher(region.concepts, groups=groups,
+                                              variations=region.keyword_variations)
+
+        # One walk over the host's labels per lookup
+        self.known_domain_trie = build_known_domain_trie(region.known_domain_tables)
+        self.country_tld_trie = build_tld_trie(region.country_tlds)
+        self.country_tld_trie.add('.edu', ('US', '.edu (typically US)'), exact=False)
+        self.us_state_matcher = FirstListedSubstring(region.us_states)
+
+        self.phone_patterns = [(country, [re.compile(pattern) for pattern in patterns])
+                               for country, patterns in region.phone_patterns.items()]
+
+        # One search per country for each address context
+        self.zip_patterns = compile_patterns(region.zip_patterns)
+        self.address_location_scanner = CountryScanner(region.address_location_indicators,
+                                                       region.address_flags)
+        self.street_indicator_pattern = (re.compile(region.street_indicator_pattern, re.IGNORECASE)
+                                         if region.street_indicator_pattern else None)
+
+        # Site-level location results, shared by every URL on the same registrable domain
+        self.geo_memo = DomainGeoMemo()
+        self._analysis_store = None
+
+    @property
+    def analysis_store(self):
+        """Results of earlier runs, reused when a page answers 304 (None when the response cache is off)."""
+        cache = get_default_cache()
+        if cache is None:
+            return None
+        if self._analysis_store is None:
+            self._analysis_store = AnalysisStore(os.path.join(cache.cache_dir, 'analysis', self.region.name),
+                                                 analysis_fingerprint(self.region))
+        return self._analysis_store
+
+    # ------------------------------------------------------------------
+    # Location
+    # ------------------------------------------------------------------
+
+    def check_known_domains(self, url):
+        """Check if URL matches known organization domains (including subdomains)."""
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower()
+        domain_without_www = domain.replace('www.', '')
+
+        known = self.known_domain_trie.lookup(domain, domain_without_www)
+        if known:
+            country, evidence_label = known
+            return country, f'{evidence_label}: {domain}'
+
+        # Check for US indicators in domain name
+        if 'american' in domain or 'america' in domain:
+            return 'US', f'Domain contains "american/america": {domain}'
+
+        # Check for US state names in domain
+        state = self.us_state_matcher.search(domain.replace('-', '').replace('.', ''))
+        if state:
+            return 'US', f'Domain contains US state name "{state}": {domain}'
+
+        if domain.endswith('.edu'):
+            return 'US', f'Domain ends with .edu: {domain}'
+
+        return None, None
+
+    def extract_domain_info(self, url):
+        """Extract domain and check for country-specific TLDs."""
+        parsed = urlparse(url)
+        domain = parsed.netloc
+
+        tld_match = self.country_tld_trie.lookup(domain)
+        if tld_match:
+            country, tld = tld_match
+            return country, f"Domain TLD: {tld}"
+
+        return None, None
+
+    def detect_phone_country_code(self, text):
+        """Detect country from phone number country codes."""
+        found = []
+        for country, patterns in self.phone_patterns:
+            if any(pattern.search(text) for pattern in patterns):
+                found.append((country, f"Phone pattern detected"))
+        return found
+
+    def _postal_address_country(self, line_clean, context, location_present):
+        """Country of an address line under zip_rules, or (False, None) if it is no address."""
+        has_zip = False
+        zip_country = None
+        for country, pattern in self.zip_patterns.items():
+            rule = self.region.zip_rules.get(country)
+            if rule is None or not pattern.search(context):
+                continue
+            if (rule == 'always'
+                    or country in location_present
+                    or (rule == 'location_or_none' and not location_present)):
+                has_zip = True
+                zip_country = country
+                break
+
+        has_location = bool(location_present)
+        location_country_name = self.address_location_scanner.first(location_present)
+
+        if has_zip and has_location:
+            return True, zip_country or location_country_name
+
+        # Some countries often use addresses without postal codes
+        if not has_zip and has_location and len(line_clean) <= 80:
+            if location_country_name in self.region.countries_without_standard_postal:
+                if self.street_indicator_pattern.search(line_clean):
+                    return True, location_country_name
+
+        return False, None
+
+    def _mentioned_address_country(self, context, location_present):
+        """Country of an address line in mention mode, or (False, None) if it is no address."""
+        # Postal codes are only looked for when the matching country is mentioned
+        for country in self.address_location_scanner.countries:
+            if country not in location_present:
+                continue
+            pattern = self.zip_patterns.get(country)
+            if pattern is None or pattern.search(context):
+                return True, country
+        return False, None
+
+    @span('address_extraction')
+    def extract_addresses_from_text(self, page_text):
+        """Extract full addresses - lines with a city/state/country and (per the region's rules) a postal code."""
+        addresses = []
+        address_with_countries = []
+        max_line = self.region.max_address_line
+
+        lines = [' '.join(line.split()) for line in page_text.split('\n')]
+
+        for i, line_clean in enumerate(lines):
+            if len(line_clean) < 5 or len(line_clean) > max_line:
+                continue
+
+            prev_line = lines[i-1] if i > 0 else ''
+            next_line = lines[i+1] if i < len(lines) - 1 else ''
+            next_line2 = lines[i+2] if i < len(lines) - 2 else ''
+
+            context_parts = []
+            if len(prev_line) < max_line:
+                context_parts.append(prev_line)
+            context_parts.append(line_clean)
+            if len(next_line) < max_line:
+                context_parts.append(next_line)
+            if len(next_line2) < max_line:
+                context_parts.append(next_line2)
+
+            context = ' '.join(context_parts)
+
+            location_present = self.address_location_scanner.find(context)
+
+            if self.region.zip_rules is not None:
+                is_valid_address, location_country = self._postal_address_country(
+                    line_clean, context, location_present)
+            else:
+                is_valid_address, location_country = self._mentioned_address_country(
+                    context, location_present)
+
+            if is_valid_address:
+                addresses.append(line_clean[:100])
+                if location_country:
+                    address_with_countries.append((line_clean[:100], location_country))
+
+        return addresses, address_with_countries
+
+    def score_country_signals(self, location_mentions, phone_numbers):
+        """Weight location mentions and phone numbers and return the top country (or None)."""
+        country_scores = {}
+
+        for source, country, keyword in location_mentions:
+            if 'address' in source:
+                weight = 25
+            elif source == 'terms':
+                weight = 20
+            elif source == 'about/contact':
+                weight = 15
+            elif source == 'main_page':
+                weight = 10
+            else:
+                weight = 2
+
+            country_scores[country] = country_scores.get(country, 0) + weight
+
+        for source, country in phone_numbers:
+            weight = 2
+
+            if country == 'US/Canada':
+                if self.region.split_us_canada_phone:
+                    weight = weight / 2
+                country_scores['US'] = country_scores.get('US', 0) + weight
+                country_scores['Canada'] = country_scores.get('Canada', 0) + weight
+            else:
+                country_scores[country] = country_scores.get(country, 0) + weight
+
+        if country_scores:
+            top_country = max(country_scores.items(), key=lambda x: x[1])
+            return top_country[0]
+
+        return None
+
+    def _read_info_page(self, info_url, page_type, signals):
+        """Fetch one about/contact/terms page and add its addresses and phones to signals.
+
+        Returns True if the page could be read.
+        """
+        max_bytes, _ = page_download_limits()
+        with span('info_page_fetch'):
+            info_response = cached_get(info_url, headers=INFO_PAGE_HEADERS, timeout=5,
+                                       max_bytes=max_bytes, accept=is_text_content)
+        if info_response.status_code != 200 or info_response.content_skipped:
+            return False
+
+        signals['info_pages'].append(info_url)
+        if page_type is None:
+            # Fallback path: not linked from the page, so announce it only once it exists
+            signals['evidence'].append(f"Checking fallback {urlparse(info_url).path}...")
+            page_type = 'about/contact'
+        with span('parse'):
+            info_text = PageDocument(info_response.content, info_url).text
+
+        info_addresses, info_addr_countries = self.extract_addresses_from_text(info_text)
+        if info_addresses:
+            for addr in info_addresses[:2]:
+                signals['addresses'].append((page_type, addr))
+                signals['evidence'].append(f"{page_type} page address: {addr[:40]}...")
+        for addr, country in info_addr_countries[:2]:
+            signals['location_mentions'].append((page_type + '_address', country, f'in address: {addr[:30]}'))
+
+        info_phones = self.detect_phone_country_code(info_text)
+        if info_phones:
+            for country, _ in info_phones:
+                signals['phone_numbers'].append((page_type, country))
+                signals['evidence'].append(f"{page_type} page phone: {country}")
+        return True
+
+    @span('info_pages')
+    def crawl_info_pages(self, page, url):
+        """Fetch the about/contact/terms pages of a site and collect location signals.
+
+        Runs once per registrable domain (see geo_memo). Returns the evidence,
+        addresses, location mentions and phone numbers found, the info pages
+        consulted, and the country those pages point to on their own.
+        """
+        signals = {
+            'evidence': [],
+            'info_pages': [],
+            'addresses': [],
+            'location_mentions': [],
+            'phone_numbers': [],
+        }
+
+        def link_priority(link):
+            href = link.get('href', '').lower()
+            if 'contact' in href:
+                return 0
+            elif 'about' in href and 'contact' not in href:
+                return 1
+            elif 'terms' in href or 'privacy' in href or 'legal' in href:
+                return 2
+            return 3
+
+        info_links = sorted(page.info_links, key=link_priority)
+
+        fetched_pages = 0
+        # Track which URLs we've already checked
+        checked_urls = set()
+
+        for link in info_links[:6]:
+            if fetched_pages >= 3:
+                break
+
+            href = link.get('href')
+            href_lower = href.lower() if href else ''
+            if href and any(keyword in href_lower for keyword in INFO_PAGE_KEYWORDS):
+                full_url = urljoin(url, href)
+                if self.region.dedupe_info_links:
+                    if full_url in checked_urls:
+                        continue
+                    checked_urls.add(full_url)
+
+                signals['evidence'].append(f"Checking {href[:30]}...")
+
+                try:
+                    page_type = 'terms' if 'terms' in href.lower() else 'about/contact'
+                    if self._read_info_page(full_url, page_type, signals):
+                        fetched_pages += 1
+                except:
+                    pass
+
+        # Fallback: Try common contact/about URLs even if not linked
+        if self.region.info_fallback_paths and fetched_pages < 3:
+            parsed_url = urlparse(url)
+            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+            for path in self.region.info_fallback_paths:
+                if fetched_pages >= 3:
+                    break
+                fallback_url = base_url + path
+                if fallback_url in checked_urls:
+                    continue
+                checked_urls.add(fallback_url)
+
+                try:
+                    if self._read_info_page(fallback_url, None, signals):
+                        fetched_pages += 1
+                except:
+                    pass
+
+        return {
+            'country': self.score_country_signals(signals['location_mentions'], signals['phone_numbers']),
+            'evidence': signals['evidence'],
+            'info_pages': signals['info_pages'],
+            'addresses': signals['addresses'],
+            'location_mentions': signals['location_mentions'],
+            'phone_numbers': signals['phone_numbers'],
+        }
+
+    @span('page_content')
+    def analyze_page_content(self, page, url):
+        """Analyze page content for geographical indicators."""
+        evidence = []
+        all_addresses = []
+        all_phone_numbers = []
+        all_location_mentions = []
+
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower().replace('www.', '')
+
+        if '.bank' in domain:
+            evidence.append("Domain is .bank TLD (US-based)")
+            return 'US', evidence
+
+        url_lower = url.lower()
+        is_info_page = any(keyword in url_lower for keyword in INFO_PAGE_KEYWORDS)
+
+        if is_info_page:
+            page_text = page.text
+        else:
+            page_text = page.footer_text(first_only=self.region.footer_first_only)
+
+        addresses_found, addresses_with_country = self.extract_addresses_from_text(page_text)
+        if addresses_found:
+            for addr in addresses_found[:3]:
+                all_addresses.append(('main_page', addr))
+                evidence.append(f"Physical address found: {addr[:50]}...")
+        for addr, country in addresses_with_country[:3]:
+            all_location_mentions.append(('address', country, f'in address: {addr[:30]}'))
+
+        phone_numbers = self.detect_phone_country_code(page_text)
+        if phone_numbers:
+            for country, _ in phone_numbers:
+                all_phone_numbers.append(('main_page', country))
+                evidence.append(f"Phone number found: {country}")
+
+        site_info, reused = self.geo_memo.get_or_compute(url, lambda: self.crawl_info_pages(page, url))
+        if reused:
+            evidence.append(f"Site info pages already checked for {site_info['domain']}")
+        evidence.extend(site_info['evidence'])
+        all_addresses.extend(site_info['addresses'])
+        all_location_mentions.extend(site_info['location_mentions'])
+        all_phone_numbers.extend(site_info['phone_numbers'])
+
+        return self.score_country_signals(all_location_mentions, all_phone_numbers), evidence
+
+    # ------------------------------------------------------------------
+    # Cultural context
+    # ------------------------------------------------------------------
+
+    def flexible_keyword_match(self, keyword, text):
+        """Check if keyword or its variations appear in text."""
+        text = text.lower()
+        keyword = keyword.lower()
+
+        variations = self.region.keyword_variations.get(keyword, [keyword])
+        return any(var in text for var in variations)
+
+    def detect_concepts_in_text(self, text):
+        """
+        Detect the region's cultural concepts in text.
+        Returns matched keywords grouped by concept, and count of unique concepts found.
+        """
+        if not text:
+            return {}, [], 0
+
+        hits = self.keyword_matcher.scan(text)
+        return hits.by_concept, hits.keywords, len(hits.by_concept)
+
+    def detect_language_indicators(self, text):
+        """Detect if text contains definition or advice language."""
+        hits = self.keyword_matcher.scan(text)
+        return bool(hits.groups['definition']), bool(hits.groups.get('advice'))
+
+    def has_region_context(self, matched_by_concept):
+        """Check if region-specific keywords are present."""
+        return any(concept in matched_by_concept for concept in self.region.specific_concepts)
+
+    @span('keyword_matching')
+    def detect_cultural_context(self, soup, page_text):
+        """
+        Detect if the page addresses the region's cultural context using concept-based matching.
+        Categories:
+        - addresses_user_dilemma: 3+ unique concepts
+        - defines_practice: Defines/explains the region's cultural practices
+        - generic_advice: General advice without cultural specificity
+        - not_related: Not related to the topic
+
+        Returns (category, matched_by_concept, matched_keywords, unique_concept_count, western_keywords).
+        """
+        if not page_text:
+            return 'not_related', {}, [], 0, []
+
+        # One scan finds concept keywords, definition language and Western keywords
+        hits = self.keyword_matcher.scan(page_text)
+        matched_by_concept = hits.by_concept
+        unique_concept_count = len(matched_by_concept)
+        has_definition_lang = bool(hits.groups['definition'])
+        has_region = self.has_region_context(matched_by_concept)
+        has_defining = any(concept in matched_by_concept for concept in self.region.defining_concepts)
+
+        # Category 1: addresses_user_dilemma
+        # - 3+ unique concepts (strict requirement)
+        if unique_concept_count >= 3:
+            category = 'addresses_user_dilemma'
+
+        # Category 2: defines_practice
+        # - Has a defining concept of the region
+        # - BUT limited other concepts (1-2 total)
+        # - AND has definition language
+        elif has_defining and unique_concept_count <= 2 and has_definition_lang:
+            category = 'defines_practice'
+
+        # Category 3: generic_advice
+        # - Has family/social keywords
+        # - BUT no region-specific keywords
+        elif unique_concept_count >= 1 and not has_region:
+            category = 'generic_advice'
+
+        # Category 4: not_related
+        # - 0 concepts matched
+        elif unique_concept_count == 0:
+            category = 'not_related'
+
+        # Default: if has some region concepts but doesn't fit other categories
+        else:
+            if has_region:
+                category = 'defines_practice'  # Default for region content
+            else:
+                category = 'generic_advice'  # Default for non-region content
+
+        # Western boundary/independence keywords (tracked separately)
+        western_keywords = hits.groups['western']
+
+        return category, matched_by_concept, hits.keywords, unique_concept_count, western_keywords
+
+    # ------------------------------------------------------------------
+    # URLs
+    # ------------------------------------------------------------------
+
+    @span('analyze_url')
+    def analyze_url(self, url):
+        """Analyze a single URL for location AND cultural context."""
+        result = {
+            'url': url,
+            'status': 'unknown',
+            'status_code': None,
+            'truncated': False,
+            'revalidated': False,
+            'country': 'Unknown',
+            'evidence': [],
+            'cultural_context': 'unknown',
+            'matched_keywords': [],
+            'matched_concepts': {},
+            'unique_concept_count': 0,
+            'western_keywords': []
+        }
+
+        # Special handling for known expired domains
+        for marker, name in self.region.expired_domains.items():
+            if marker in url:
+                result['country'] = 'Expired'
+                result['status'] = 'expired_server'
+                result['evidence'].append(f'Known expired server ({name})')
+                return result
+
+        try:
+            known_country, known_evidence = self.check_known_domains(url)
+            if known_country:
+                result['country'] = known_country
+                result['evidence'].append(known_evidence)
+            else:
+                domain_country, domain_evidence = self.extract_domain_info(url)
+                if domain_country:
+                    result['country'] = domain_country
+                    result['evidence'].append(domain_evidence)
+
+            max_bytes, text_limit = page_download_limits()
+            with span('page_fetch'):
+                response = cached_get(url, headers=PAGE_HEADERS, timeout=15, max_bytes=max_bytes,
+                                      accept=is_text_content, enough=TextBudget(text_limit) if text_limit else None)
+            result['status_code'] = response.status_code
+            content_type = response.headers.get('Content-Type', '')
+
+            if response.status_code == 200 and (response.content_skipped or
+                                                not is_text_content(content_type, response.content[:512])):
+                # PDF, image or media link: nothing to parse for location or cultural context
+                result['status'] = 'non_html'
+                result['evidence'].append(f"Not an HTML page ({content_type or 'no content type'}), content not analyzed")
+
+            elif response.status_code == 200:
+                # Unchanged since an earlier run (304): reuse that run's analysis
+                store = self.analysis_store
+                body_sha256 = hashlib.sha256(response.content).hexdigest()
+                stored = None
+                if store is not None and getattr(response, 'revalidated', False):
+                    stored = store.get(url, body_sha256)
+                if stored is not None:
+                    stored['revalidated'] = True
+                    return stored
+
+                result['status'] = 'working'
+                result['truncated'] = response.truncated
+
+                with span('parse'):
+                    page = PageDocument(response.content, url)
+
+                # Location detection
+                content_country, content_evidence = self.analyze_page_content(page, url)
+
+                if content_evidence:
+                    result['evidence'].extend(content_evidence)
+
+                if known_country:
+                    if content_country and content_country != known_country:
+                        result['evidence'].append(f"Content analysis suggested: {content_country} (but known organization is {known_country})")
+                elif content_country and not domain_country:
+                    result['country'] = content_country
+                elif content_country and domain_country and content_country == domain_country:
+                    result['country'] = domain_country
+                elif content_country and domain_country and content_country != domain_country:
+                    result['evidence'].append(f"Content analysis suggested: {content_country} (but domain says {domain_country})")
+
+                # Cultural context detection
+                category, matched_by_concept, matched_keywords, unique_count, western_kw = \
+                    self.detect_cultural_context(page.soup, page.text)
+                result['cultural_context'] = category
+                result['matched_keywords'] = matched_keywords
+                result['matched_concepts'] = matched_by_concept
+                result['unique_concept_count'] = unique_count
+                result['western_keywords'] = western_kw
+
+                # Pages with validators can be revalidated on the next run
+                if store is not None and not response.truncated and \
+                        (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+                    store.put(url, body_sha256, result)
+
+            elif response.status_code == 404:
+                result['status'] = '404'
+                result['evidence'].append('Page not found (404)')
+            else:
+                result['status'] = f'error_{response.status_code}'
+                result['evidence'].append(f'HTTP status code: {response.status_code}')
+
+        except requests.exceptions.Timeout:
+            result['status'] = 'timeout'
+            result['evidence'].append('Request timed out after 15 seconds')
+        except requests.exceptions.ConnectionError:
+            result['status'] = 'connection_error'
+            result['evidence'].append('Could not connect to URL')
+        except Exception as e:
+            result['status'] = 'error'
+            result['evidence'].append(f'Error: {str(e)}')
+
+        return result
+
+    def analyze_urls(self, urls, urls_by_turn, first_conversation, output_file=None,
+                     max_workers=None, host_delay=None, checkpoint_file=None, usage=None, progress_file=None,
+                     turn_timings=None):
+        """Analyze a list of URLs for location and cultural context, with turn tracking.
+
+        URLs are analyzed concurrently by `max_workers` threads (default from
+        URL_ANALYSIS_WORKERS), waiting `host_delay` seconds between visits to the
+        same host. Results are always reported in the order of `urls`.
+
+        A URL listed more than once in `urls` (cited in several turns) is
+        analyzed once, and each of its entries in the output gets a copy of
+        that result.
+
+        With `checkpoint_file`, every result is appended to that journal as soon
+        as it is ready. A run that was interrupted only analyzes the URLs missing
+        from the journal, the output is assembled from the journal, and the
+        journal is deleted once the output file is written.
+
+        `usage` (the to_json() of the run's openai_limits.UsageLedger) is
+        written to the output as its "usage" block.
+
+        With `progress_file`, the run's progress (URLs started and finished,
+        with their country and category) is published there as structured
+        events for the visualization server; see progress_events.py.
+
+        The time spent in each URL's analysis steps, together with
+        `turn_timings` (the UsageLedger's turn_timings() of the collection),
+        goes to the output's "timings" block; see timing_spans.py.
+        """
+        if output_file is None:
+            output_file = f'{self.region.name}_url_analyzer_results.json'
+
+        journal = CheckpointJournal(checkpoint_file, ['url'])
+        pending = [url for url in dict.fromkeys(urls) if journal.get(url) is None]
+
+        # Which turn each URL belongs to (the first turn listing it)
+        turn_of_url = {}
+        for turn_num, turn_urls in urls_by_turn.items():
+            for turn_url in turn_urls:
+                turn_of_url.setdefault(turn_url, turn_num)
+
+        progress = ProgressPublisher(self.region.name, progress_file)
+        progress.run_started(len(set(urls)), len(pending),
+                             [journal.get(url)['result'] for url in dict.fromkeys(urls) if journal.get(url) is not None])
+
+        url_timings = {}
+
+        def analyze(url):
+            progress.url_started(url, turn_of_url.get(url))
+            with recording() as timings:
+                result = self.analyze_url(url)
+            url_timings[url] = timings.to_json()
+            return result
+
+        print(f"Analyzing {len(urls)} URLs for location and cultural context...")
+        if len(pending) < len(set(urls)):
+            print(f"Resuming from checkpoint: {len(set(urls)) - len(pending)} URLs already analyzed, "
+                  f"{len(pending)} to go")
+        print("=" * 80)
+
+        for i, url, result in analyze_in_order(pending, analyze, max_workers, host_delay):
+            print(f"\n[{i}/{len(pending)}] Analyzing: {url}")
+
+            turn_number = turn_of_url.get(url)
+            result['turn_number'] = turn_number
+            journal.add({"url": url, "result": result, "timings": url_timings.get(url, {})})
+            progress.url_finished(i, len(pending), url, result)
+
+            print(f"  Turn: {turn_number}")
+            print(f"  Status: {result['status']}")
+            print(f"  Country: {result['country']}")
+            print(f"  Cultural Context: {result['cultural_context']}")
+            print(f"  Unique Concepts: {result['unique_concept_count']}")
+            if result['matched_keywords']:
+                print(f"  Matched Keywords: {', '.join(result['matched_keywords'][:5])}")
+            if result['matched_concepts']:
+                print(f"  Matched Concepts: {', '.join(result['matched_concepts'].keys())}")
+            if result['western_keywords']:
+                print(f"  Western Keywords Found: {', '.join(result['western_keywords'])}")
+
+        # Build the analysis results per turn, in the order of urls
+        # (results resumed from the journal get the turn of this run's collection)
+        url_analysis_results = []
+        url_timing_records = []
+        for url in urls:
+            record = journal.get(url)
+            result = dict(record['result'])
+            result['turn_number'] = turn_of_url.get(url)
+            url_analysis_results.append(result)
+            url_timing_records.append({"url": url, **record.get('timings', {})})
+
+        # Build the final output structure
+        output_data = {
+            "first_conversation": first_conversation,
+            "url_collection_summary": {
+                "total_unique_urls": len(urls),
+                "urls_by_turn": {str(turn_num): turn_urls for turn_num, turn_urls in sorted(urls_by_turn.items())}
+            },
+            "url_analysis": url_analysis_results,
+            "summary": summarize(url_analysis_results)
+        }
+        if usage is not None:
+            output_data["usage"] = usage
+        output_data["timings"] = timings_block(turn_timings or [], url_timing_records)
+
+        write_results(output_file, output_data)
+        journal.clear()
+        progress.run_finished(output_file, url_analysis_results)
+
+        print("\n" + "=" * 80)
+        print(f"Analysis complete! Results saved to: {output_file}")
+        connection_summary = get_default_fetcher().summary()
+        if connection_summary:
+            print(f"Page downloads: {connection_summary}")
+
+        self.print_summary(url_analysis_results, output_data["summary"], output_data["timings"])
+
+        return output_data
+
+    def print_summary(self, results, summary=None, timings=None):
+        """Print summary statistics (from `summary`, the results' summary block, if given).
+
+        With `timings` (the results' timings block), a histogram of the time
+        spent per span follows.
+        """
+        if summary is None:
+            summary = summarize(results)
+
+        print("\n" + "=" * 80)
+        print("SUMMARY")
+        print("=" * 80)
+
+        print(f"\nOf {len(results)} URLs cited:")
+
+        # Cultural context summary
+        category_labels = {
+            'addresses_user_dilemma': "Addresses user's specific dilemma",
+            'defines_practice': "Defines cultural practice only",
+            'generic_advice': f"Generic advice (no {self.region.label} context)",
+            'not_related': "Not related",
+        }
+
+        print("\nBy Relevance Category:")
+        for category, label in category_labels.items():
+            if category in summary['categories']:
+                entry = summary['categories'][category]
+                print(f"  {label}: {entry['count']} ({entry['count'] / len(results) * 100:.1f}%)")
+
+        # Country summary (summary blocks list the most frequent first)
+        priority_countries = self.region.priority_countries
+        country_counts = {country: entry['count'] for country, entry in summary['countries'].items()}
+
+        print("\nBy Country:")
+        for country in priority_countries:
+            if country in country_counts:
+                count = country_counts[country]
+                percentage = (count / len(results)) * 100
+                print(f"  {country}: {count} ({percentage:.1f}%)")
+
+        for country, count in country_counts.items():
+            if country not in priority_countries:
+                percentage = (count / len(results)) * 100
+                print(f"  {country}: {count} ({percentage:.1f}%)")
+
+        print("\nBy Status:")
+        for status, entry in summary['statuses'].items():
+            percentage = (entry['count'] / len(results)) * 100
+            print(f"  {status}: {entry['count']} ({percentage:.1f}%)")
+
+        if timings:
+            print_timings(timings)
+
+
+def get_region(name):
+    """Return the RegionAnalyzer of a registered region, built once per process."""
+    if name not in REGION_MODULES:
+        raise ValueError(f"Unknown region: {name} (expected one of {', '.join(sorted(REGION_MODULES))})")
+    return importlib.import_module(REGION_MODULES[name]).ENGINE
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Results Index
+In-memory index of the regions' results files for the visualization server's
+JSON API. A file is parsed once and kept with what the API hands out:
+    conversation   The first conversation (question / advice turns)
+    urls           Every cited URL in turn order (urls_by_turn), merged with
+                   its url_analysis record, so it can be served page by page
+    summary        The file's summary block (results_summary.summarize()),
+                   computed when the file has none
+Every lookup stats the file and parses it again only when its size or mtime
+changed, e.g. after a region run rewrote it while the server was running.
+
+Regions are named like the main scripts (indian, nigerian, filipino) or like
+the visualization's contexts (india, nigeria, philippines).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from results_summary import RESULTS_FILES, summarize
+from visualization_payload import CONTEXT_REGIONS
+
+# URLs per page of the urls route, by default and at most
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def url_entries(data):
+    """Cited URLs of a results file in turn order, each merged with its url_analysis record."""
+    analyzed = {result['url']: result for result in data.get('url_analysis', [])}
+    urls_by_turn = data.get('url_collection_summary', {}).get('urls_by_turn', {})
+    entries = []
+    for turn in sorted(urls_by_turn, key=int):
+        for url in urls_by_turn[turn]:
+            entries.append(dict(analyzed.get(url, {}), url=url, turn_number=int(turn)))
+    return entries
+
+
+class RegionResults:
+    """The parts of one loaded results file the API serves.
+
+    Args:
+        region: Region name (indian, nigerian, filipino).
+        path: Path of the results file.
+        data: Its parsed JSON.
+        mtime: Its modification time.
+    """
+
+    def __init__(self, region, path, data, mtime):
+        self.region = region
+        self.path = path
+        self.mtime = mtime
+        self.conversation = data.get('first_conversation', [])
+        self.urls = url_entries(data)
+        self.summary = data.get('summary') or summarize(data.get('url_analysis', []))
+
+    def describe(self):
+        """Entry of the region in the regions list."""
+        context = {region: context for context, region in CONTEXT_REGIONS.items()}.get(self.region)
+        return {
+            'region': self.region,
+            'context': context,
+            'file': os.path.basename(self.path),
+            'modified': datetime.fromtimestamp(self.mtime, timezone.utc).isoformat(timespec='seconds'),
+            'turns': len(self.conversation),
+            'total_urls': self.summary['total_urls'],
+            'cited_urls': len(self.urls),
+        }
+
+    def page(self, offset, limit):
+        """{offset, limit, total, urls} of a slice of the cited URLs."""
+        return {
+            'region': self.region,
+            'offset': offset,
+            'limit': limit,
+            'total': len(self.urls),
+            'urls': self.urls[offset:offset + limit],
+        }
+
+
+class ResultsIndex:
+    """Thread-safe index of the results files in a directory, reloaded when they change.
+
+    Args:
+        directory: Directory of the results files.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded = {}   # region -> (size, mtime_ns, RegionResults)
+
+    @staticmethod
+    def region_name(name):
+        """Region of a region or context name, or None if it is neither."""
+        name = name.lower()
+        if name in RESULTS_FILES:
+            return name
+        return CONTEXT_REGIONS.get(name)
+
+    def get(self, name):
+        """RegionResults of a region or context name, or None if unknown or not run yet."""
+        region = self.region_name(name)
+        if region is None:
+            return None
+        path = os.path.join(self.directory, RESULTS_FILES[region])
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._loaded.get(region)
+            if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                return cached[2]
+            # Parsed under the lock, so concurrent requests after a rewrite parse it once
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                # Still being written by a region run: keep serving the last complete version
+                if cached is not None:
+                    return cached[2]
+                raise
+            results = RegionResults(region, path, data, stat.st_mtime)
+            self._loaded[region] = (stat.st_size, stat.st_mtime_ns, results)
+            return results
+
+    def regions(self):
+        """RegionResults of every region whose results file exists."""
+        return [results for results in map(self.get, RESULTS_FILES) if results is not None]
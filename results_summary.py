@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Results Summary
+Aggregates the url_analysis of one or more *_therapy_bias_results.json files
+in one pass, for print_summary, the "summary" block of the results JSON and
+cross-region comparisons.
+
+The results are first turned into columns (ResultColumns): country, status
+and cultural_context become arrays of integer codes into a vocabulary, and
+the Western keywords and matched concepts of every URL become one flat code
+array per field with per-URL offsets. Counts are then tallied over whole
+columns, and the concept x Western keyword co-occurrence matrix is filled in
+one sweep over the flattened lists.
+
+The summary block (summarize()):
+    total_urls          Number of URLs analyzed
+    countries           {country: {count, share}}, most frequent first
+    statuses            {status: {count, share}}
+    categories          {cultural_context: {count, share}}
+    western_keywords    {keyword: {count, share}}, share of URLs citing it
+    concepts            {concept: {count, share}}, URLs matching the concept
+    concept_keywords    {concepts, keywords, matrix}: matrix[i][j] is the
+                        number of URLs matching concepts[i] that contain
+                        keywords[j]
+
+Usage:
+    python results_summary.py                 # the three regions' results files
+    python results_summary.py a.json b.json   # any results files
+adds (or refreshes) the summary block of every file and prints a
+cross-region comparison.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from array import array
+from collections import Counter
+
+# Results files of the regions, as written by the main scripts
+RESULTS_FILES = {
+    'filipino': 'filipino_therapy_bias_results.json',
+    'indian': 'indian_therapy_bias_results.json',
+    'nigerian': 'nigerian_therapy_bias_results.json',
+}
+
+# Digits kept in the shares of the summary block
+SHARE_DIGITS = 4
+
+
+def _encode(values, vocabulary):
+    """Integer codes of values, adding new values to vocabulary in order of first appearance."""
+    index = {value: code for code, value in enumerate(vocabulary)}
+    codes = array('i')
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(vocabulary)
+            vocabulary.append(value)
+        codes.append(code)
+    return codes
+
+
+def _encode_lists(lists, vocabulary):
+    """Flattened codes of a list per URL, and the offsets of each URL's codes (len(lists) + 1)."""
+    offsets = array('i', [0])
+    flat = []
+    for values in lists:
+        flat.extend(values)
+        offsets.append(len(flat))
+    return _encode(flat, vocabulary), offsets
+
+
+class ResultColumns:
+    """The url_analysis of a results file as columns of integer codes.
+
+    Args:
+        results: The url_analysis list of a results file.
+    """
+
+    SINGLE_FIELDS = {'country': 'Unknown', 'status': 'unknown', 'cultural_context': 'unknown'}
+
+    def __init__(self, results):
+        self.size = len(results)
+        self.vocabularies = {}
+        self.columns = {}
+        for field, default in self.SINGLE_FIELDS.items():
+            self.vocabularies[field] = []
+            self.columns[field] = _encode((result.get(field) or default for result in results),
+                                          self.vocabularies[field])
+
+        self.vocabularies['western_keywords'] = []
+        self.keyword_codes, self.keyword_offsets = _encode_lists(
+            (result.get('western_keywords') or [] for result in results), self.vocabularies['western_keywords'])
+        self.vocabularies['concepts'] = []
+        self.concept_codes, self.concept_offsets = _encode_lists(
+            (result.get('matched_concepts') or {} for result in results), self.vocabularies['concepts'])
+
+    def counts(self, field):
+        """{value: count} of a field, in order of first appearance."""
+        if field == 'western_keywords':
+            column = self.keyword_codes
+        elif field == 'concepts':
+            column = self.concept_codes
+        else:
+            column = self.columns[field]
+        tally = Counter(column)
+        return {value: tally[code] for code, value in enumerate(self.vocabularies[field])}
+
+    def keyword_counts_for(self, concepts):
+        """(URLs matching any of `concepts`, {keyword: count} over those URLs in order of first appearance)."""
+        vocabulary = self.vocabularies['concepts']
+        wanted = {vocabulary.index(concept) for concept in concepts if concept in vocabulary}
+        keywords = self.vocabularies['western_keywords']
+        tally = Counter()
+        url_count = 0
+        for i in range(self.size):
+            if wanted.intersection(self.concept_codes[self.concept_offsets[i]:self.concept_offsets[i + 1]]):
+                url_count += 1
+                tally.update(self.keyword_codes[self.keyword_offsets[i]:self.keyword_offsets[i + 1]])
+        return url_count, {keywords[code]: count for code, count in tally.items()}
+
+    def co_occurrence(self):
+        """(concepts, keywords, matrix) where matrix[i][j] counts URLs with concept i and keyword j."""
+        concepts = self.vocabularies['concepts']
+        keywords = self.vocabularies['western_keywords']
+        width = len(keywords)
+        cells = array('i', bytes(4 * len(concepts) * width))
+        for i in range(self.size):
+            url_keywords = self.keyword_codes[self.keyword_offsets[i]:self.keyword_offsets[i + 1]]
+            for concept in self.concept_codes[self.concept_offsets[i]:self.concept_offsets[i + 1]]:
+                row = concept * width
+                for keyword in url_keywords:
+                    cells[row + keyword] += 1
+        matrix = [cells[row * width:(row + 1) * width].tolist() for row in range(len(concepts))]
+        return concepts, keywords, matrix
+
+
+def _ranked(counts, total):
+    """{value: {count, share}}, most frequent first (ties keep their order)."""
+    return {
+        value: {'count': count, 'share': round(count / total, SHARE_DIGITS) if total else 0.0}
+        for value, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    }
+
+
+def summarize(results):
+    """Return the summary block of a url_analysis list (see the module docstring)."""
+    columns = ResultColumns(results)
+    total = columns.size
+    concepts, keywords, matrix = columns.co_occurrence()
+    return {
+        'total_urls': total,
+        'countries': _ranked(columns.counts('country'), total),
+        'statuses': _ranked(columns.counts('status'), total),
+        'categories': _ranked(columns.counts('cultural_context'), total),
+        'western_keywords': _ranked(columns.counts('western_keywords'), total),
+        'concepts': _ranked(columns.counts('concepts'), total),
+        'concept_keywords': {
+            'concepts': concepts,
+            'keywords': keywords,
+            'matrix': matrix,
+        },
+    }
+
+
+def load_results(paths):
+    """Return {path: results JSON} of the given results files."""
+    loaded = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            loaded[path] = json.load(f)
+    return loaded
+
+
+def write_results(path, data):
+    """Write a results file through a temporary file, so readers never see it half-written."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_summary(path, data):
+    """Add the summary block to a loaded results file and write it back."""
+    data['summary'] = summarize(data['url_analysis'])
+    write_results(path, data)
+    return data['summary']
+
+
+def print_comparison(summaries, top=5):
+    """Print the top countries, categories and Western keywords of several results side by side."""
+    for section in ('countries', 'categories', 'western_keywords'):
+        print(f"\n{section.replace('_', ' ').title()} (share of URLs):")
+        for name, summary in summaries.items():
+            ranked = list(summary[section].items())[:top]
+            shares = ', '.join(f"{value} {entry['share'] * 100:.1f}%" for value, entry in ranked)
+            print(f"  {name} ({summary['total_urls']} URLs): {shares or '-'}")
+
+
+def main(paths):
+    if not paths:
+        paths = list(RESULTS_FILES.values())
+    regions = {file: region for region, file in RESULTS_FILES.items()}
+    summaries = {}
+    for path, data in load_results(paths).items():
+        summaries[regions.get(os.path.basename(path), path)] = write_summary(path, data)
+        print(f"Summary written to {path}")
+    print_comparison(summaries)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Concurrent Session Runner
+Shared by the Filipino, Indian and Nigerian main scripts. After the first
+session has built the conversation history, every extra session asks the same
+turns against that same fixed history, so the turns of all extra sessions are
+independent of each other and can run on a thread pool. Results come back in
+the order the old one-session-at-a-time loop produced them.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def run_sessions_concurrently(run_turn, turns, num_sessions, first_session_number=2, max_workers=None):
+    """Run num_sessions repeat sessions of `turns` concurrently.
+
+    Args:
+        run_turn: Function (session, turn_number, question) -> list of URLs.
+        turns: The questions of one session, asked as turns 1..len(turns).
+        num_sessions: Number of sessions to run.
+        first_session_number: Number of the first session, for progress output.
+        max_workers: Number of turns in flight at once. Defaults to
+                     SESSION_WORKERS from the environment (4).
+
+    Returns:
+        List of {turn_number, urls} dicts, session by session and turn by
+        turn, exactly as the serial loop would have appended them.
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv("SESSION_WORKERS", "4"))
+
+    tasks = [(session, turn_number, question)
+             for session in range(first_session_number, first_session_number + num_sessions)
+             for turn_number, question in enumerate(turns, 1)]
+    results = [None] * len(tasks)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            # Each turn runs in a copy of the caller's context (e.g. cli.py's output prefix)
+            executor.submit(contextvars.copy_context().run, run_turn, session, turn_number, question): index
+            for index, (session, turn_number, question) in enumerate(tasks)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            index = futures[future]
+            session, turn_number, _ = tasks[index]
+            results[index] = future.result()
+            print(f"  [{done}/{len(tasks)}] Session {session}, turn {turn_number}: "
+                  f"{len(results[index])} URLs")
+
+    return [{"turn_number": turn_number, "urls": urls}
+            for (_, turn_number, _), urls in zip(tasks, results)]
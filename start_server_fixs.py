@@ -1,33 +1,267 @@
 #!/usr/bin/env python3
 """
 Simple HTTP server to serve the epistemic violence visualization
-Run this script and then open http://localhost:8000/part1_fixed.html in your browser
+Run this script and then open http://localhost:8000/ in your browser
+
+Only the page, the results files, visualization_data.json and the icons are
+served (static_assets.SERVED_FILES); every other path, including .env and the
+cache directories, is 404.
+
+Every request gets its own thread, and files come from an in-memory store
+(static_assets.py) with gzip/brotli copies and ETags: a reload only asks the
+page again (304 if unchanged), while the icons and JSON files, which the page
+references with content-versioned URLs, stay in the browser cache.
+
+JSON API, answered from an in-memory index of the results files
+(results_index.py) that reloads a file only when it changed on disk:
+    /api/regions                                  Regions with results, their files and sizes
+    /api/region/<name>/summary                    A region's summary block
+    /api/region/<name>/conversation               Its first conversation
+    /api/region/<name>/urls?offset=0&limit=50     A page of its cited URLs with their analysis
+    /api/progress                                 Progress events of region runs (server-sent events)
+<name> is a region (indian) or a visualization context (india). HEAD gets the
+same headers as GET. A results file that does not parse yet, with no earlier
+version to serve, gets 503.
+
+/api/progress follows the progress files the region runs write
+(progress_events.py): a new client first gets the events of runs still in
+progress, then every event as it is written.
 """
 
+import email.utils
+import functools
 import http.server
-import socketserver
+import io
+import json
 import os
+import threading
+import time
+import urllib.parse
+from http import HTTPStatus
+
+from progress_events import REGION_CONTEXTS, ProgressTail, progress_dir
+from results_index import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ResultsIndex
+from static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, AssetStore, StaticAsset
+from visualization_payload import PAYLOAD_FILE, build_payload, refresh_payload
 
 PORT = 8000
+PAGE = 'epistemic_violence_visualization.html'
+API_PREFIX = '/api/'
+
+# Seconds between two looks at the progress files, and between keepalives of an idle stream
+PROGRESS_POLL_INTERVAL = 0.5
+PROGRESS_KEEPALIVE = 15
+
+_payload_lock = threading.Lock()
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(self, *args, assets, results, **kwargs):
+        self.assets = assets
+        self.results = results
+        super().__init__(*args, **kwargs)
+
     def end_headers(self):
         # Add CORS headers to allow fetch requests
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
         super().end_headers()
 
-# Change to the script's directory
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == API_PREFIX + 'progress':
+            self.send_progress()
+        elif path.startswith(API_PREFIX):
+            self.send_api()
+        else:
+            super().do_GET()
+
+    def do_HEAD(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == API_PREFIX + 'progress':
+            self.send_progress_headers()
+        elif path.startswith(API_PREFIX):
+            self.send_api(send_body=False)
+        else:
+            super().do_HEAD()
+
+    def send_head(self):
+        parts = urllib.parse.urlsplit(self.path)
+        if parts.path == '/':
+            self.send_response(HTTPStatus.FOUND)
+            self.send_header('Location', '/' + PAGE)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        path = self.translate_path(self.path)
+        if path.endswith(('.html', '.htm')) or os.path.basename(path) == PAYLOAD_FILE:
+            # Pages carry the version of the payload, so both see results that changed while serving
+            with _payload_lock:
+                refresh_payload(self.directory)
+                asset = self.assets.get(path)
+        else:
+            asset = self.assets.get(path)
+        if asset is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        version = urllib.parse.parse_qs(parts.query).get('v')
+        if version and version[0] == asset.version:
+            return self.send_asset(asset, IMMUTABLE_CACHE_CONTROL)
+        return self.send_asset(asset, REVALIDATE_CACHE_CONTROL)
+
+    def send_asset(self, asset, cache_control, status=HTTPStatus.OK):
+        """Send the headers of a StaticAsset (or 304) and return its body to copy, or None."""
+        encoding, body = asset.negotiate(self.headers.get('Accept-Encoding'))
+
+        if status == HTTPStatus.OK and asset.matches(self.headers.get('If-None-Match', '')):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', asset.etag_for(encoding))
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        self.send_response(status)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', asset.etag_for(encoding))
+        self.send_header('Last-Modified', email.utils.formatdate(asset.mtime, usegmt=True))
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def send_api(self, send_body=True):
+        """Answer a JSON API request (see the module docstring); only its headers if not send_body (HEAD)."""
+        parts = urllib.parse.urlsplit(self.path)
+        route = parts.path[len(API_PREFIX):].strip('/').split('/')
+        query = urllib.parse.parse_qs(parts.query)
+        try:
+            status, data, mtime = HTTPStatus.OK, self.api_response(route, query), time.time()
+        except APIError as e:
+            status, data, mtime = e.status, {'error': str(e)}, time.time()
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        f = self.send_asset(StaticAsset(body, 'application/json', mtime), REVALIDATE_CACHE_CONTROL, status)
+        if f is not None and send_body:
+            self.copyfile(f, self.wfile)
+
+    def send_progress_headers(self):
+        """Send the headers of the progress stream."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def send_progress(self):
+        """Stream the progress events of region runs (server-sent events) until the client goes away."""
+        tails = [ProgressTail(os.path.join(progress_dir(), f'{region}.jsonl')) for region in REGION_CONTEXTS]
+        self.send_progress_headers()
+
+        last_write = time.monotonic()
+        try:
+            self.wfile.write(b'retry: 3000\n\n')
+            while True:
+                chunks = []
+                for tail in tails:
+                    for event in tail.read():
+                        data = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+                        chunks.append(f"event: {event['event']}\ndata: {data}\n\n")
+                if chunks:
+                    self.wfile.write(''.join(chunks).encode('utf-8'))
+                elif time.monotonic() - last_write >= PROGRESS_KEEPALIVE:
+                    # Comment line, to notice clients that went away
+                    self.wfile.write(b': keepalive\n\n')
+                else:
+                    time.sleep(PROGRESS_POLL_INTERVAL)
+                    continue
+                self.wfile.flush()
+                last_write = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def api_response(self, route, query):
+        try:
+            return self.route_api(route, query)
+        except ValueError:
+            # A results file that does not parse and has no earlier version to fall back on
+            raise APIError(HTTPStatus.SERVICE_UNAVAILABLE, "Results are being written, try again shortly")
+
+    def route_api(self, route, query):
+        if route == ['regions']:
+            return {'regions': [results.describe() for results in self.results.regions()]}
+        if len(route) != 3 or route[0] != 'region' or route[2] not in ('summary', 'conversation', 'urls'):
+            raise APIError(HTTPStatus.NOT_FOUND, f"No API route {'/'.join(route)!r}")
+        results = self.results.get(route[1])
+        if results is None:
+            raise APIError(HTTPStatus.NOT_FOUND, f"No results for region {route[1]!r}")
+
+        if route[2] == 'summary':
+            return dict(results.describe(), summary=results.summary)
+        if route[2] == 'conversation':
+            return {'region': results.region, 'conversation': results.conversation}
+        offset = _query_int(query, 'offset', 0)
+        limit = min(_query_int(query, 'limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        return results.page(offset, limit)
+
+
+def _query_int(query, name, default):
+    value = query.get(name, [''])[0]
+    if not value:
+        return default
+    if not value.isdecimal():
+        raise APIError(HTTPStatus.BAD_REQUEST, f"{name} must be a non-negative integer, not {value!r}")
+    return int(value)
+
+
+class APIError(Exception):
+    """An API request that cannot be answered, with its HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class VisualizationServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(port=PORT):
+    """Serve the script's directory until Ctrl+C (also called in-process by cli.py)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    # The page draws from the aggregates of the current results files
+    try:
+        build_payload(directory)
+        print(f"Built {PAYLOAD_FILE} from the results files")
+    except ValueError as e:
+        print(f"Could not build {PAYLOAD_FILE} yet ({e}); it is rebuilt once the results files parse")
+
+    # Serve files from the script's directory, compressed once up front
+    assets = AssetStore(directory)
+    print(f"Loaded {assets.warm()} pages, data files and icons")
+    Handler = functools.partial(MyHTTPRequestHandler, directory=directory, assets=assets,
+                                results=ResultsIndex(directory))
+
+    with VisualizationServer(("", port), Handler) as httpd:
+        print("=" * 80)
+        print(f"Server started at http://localhost:{port}/")
+        print(f"Open this URL in your browser:")
+        print(f"    http://localhost:{port}/{PAGE}")
+        print("=" * 80)
+        print("Press Ctrl+C to stop the server")
+        print()
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServer stopped.")
+    return 0
 
-Handler = MyHTTPRequestHandler
 
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    print("=" * 80)
-    print(f"Server started at http://localhost:{PORT}/")
-    print(f"Open this URL in your browser:")
-    print(f"    http://localhost:{PORT}/part1_fixed.html")
-    print("=" * 80)
-    print("Press Ctrl+C to stop the server")
-    print()
-    httpd.serve_forever()
+if __name__ == "__main__":
+    serve()
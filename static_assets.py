@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Static Assets
+In-memory store of the files the visualization server hands out, so a
+classroom loading the page at once does not re-read and re-compress them per
+request.
+
+Every file is read once (and again only when its size or mtime changes) and
+kept with:
+    etag       A content hash, answered with 304 Not Modified on If-None-Match
+    version    The first characters of that hash, for versioned URLs
+    encodings  Gzip (and brotli, when the brotli module is installed) copies
+               of text files, compressed when the file is loaded, not per request
+
+Only files named in SERVED_FILES, directly in the served directory, are
+handed out: the page, the results files, the payload and the icons. Anything
+else, such as .env or the cache and checkpoint directories, is not found.
+
+HTML pages are served with their references to local .json and .png files
+rewritten to versioned URLs (greyspace.png -> greyspace.png?v=<version>). A
+versioned URL never changes content, so the server can let browsers cache it
+for a year; the page itself is revalidated with its ETag, and picks up the new
+versions when a results file or icon changes.
+"""
+
+import fnmatch
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Names (fnmatch patterns) of the files that are served
+SERVED_FILES = ('*.html', '*_therapy_bias_results.json', 'visualization_data.json', '*.png')
+
+# Files loaded on startup, and whose references in HTML pages are versioned
+VERSIONED_EXTENSIONS = ('.json', '.png')
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Characters of the content hash in versioned URLs
+VERSION_LENGTH = 12
+
+# Cache-Control of versioned URLs, and of everything else (revalidated with the ETag)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Quoted local file names in HTML (src="x.png", fetch('x.json'))
+_REFERENCE_PATTERN = re.compile(r"""(["'])([\w.-]+(?:%s))\1""" % '|'.join(re.escape(ext) for ext in
+                                                                          VERSIONED_EXTENSIONS))
+
+
+class StaticAsset:
+    """One served file: its body, content type, ETag and compressed copies.
+
+    Args:
+        body: File content (for HTML, after rewriting references).
+        content_type: Content-Type header value.
+        mtime: Modification time of the file, for Last-Modified.
+    """
+
+    def __init__(self, body, content_type, mtime):
+        self.body = body
+        self.content_type = content_type
+        self.mtime = mtime
+        digest = hashlib.sha256(body).hexdigest()
+        self.version = digest[:VERSION_LENGTH]
+        self.etag = f'"{digest[:32]}"'
+        self.encodings = {}
+        if content_type.startswith(COMPRESSIBLE_TYPES) and body:
+            self._compress('gzip', gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._compress('br', brotli.compress(body))
+
+    def _compress(self, encoding, compressed):
+        # Kept only when it saves something
+        if len(compressed) < len(self.body):
+            self.encodings[encoding] = compressed
+
+    def etag_for(self, encoding):
+        """ETag of the body sent with Content-Encoding `encoding` (None for identity)."""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match):
+        """True if an If-None-Match header names any encoding of this content."""
+        if if_none_match.strip() == '*':
+            return True
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return any(self.etag_for(encoding) in tags for encoding in (None, *self.encodings))
+
+    def negotiate(self, accept_encoding):
+        """(encoding, body) to send for an Accept-Encoding header; encoding is None for identity."""
+        accepted = set()
+        for part in (accept_encoding or '').split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    pass
+            if quality > 0:
+                accepted.add(name.strip().lower())
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and (encoding in accepted or '*' in accepted):
+                return encoding, self.encodings[encoding]
+        return None, self.body
+
+
+class AssetStore:
+    """Thread-safe cache of the StaticAssets of one directory.
+
+    Args:
+        directory: Directory served.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self._lock = threading.Lock()
+        self._files = {}   # path -> (size, mtime_ns, StaticAsset)
+        self._pages = {}   # path -> (size, mtime_ns, versions, StaticAsset) of rewritten HTML
+
+    def _load(self, path):
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/'):
+            content_type += '; charset=utf-8'
+        asset = StaticAsset(body, content_type, stat.st_mtime)
+        with self._lock:
+            self._files[path] = (stat.st_size, stat.st_mtime_ns, asset)
+        return asset
+
+    def serves(self, path):
+        """True if `path` is a file of the directory that may be served (see SERVED_FILES)."""
+        path = os.path.abspath(path)
+        name = os.path.basename(path)
+        return (os.path.dirname(path) == self.directory
+                and not name.startswith('.')
+                and any(fnmatch.fnmatchcase(name, pattern) for pattern in SERVED_FILES)
+                and os.path.isfile(path))
+
+    def version(self, name):
+        """Content version of a served file of the directory, or None if there is no such file."""
+        path = os.path.join(self.directory, name)
+        if not self.serves(path):
+            return None
+        return self._load(path).version
+
+    def _page(self, path):
+        source = self._load(path)
+        stat = os.stat(path)
+        text = source.body.decode('utf-8')
+        names = sorted(set(match.group(2) for match in _REFERENCE_PATTERN.finditer(text)))
+        versions = tuple((name, self.version(name)) for name in names)
+        with self._lock:
+            cached = self._pages.get(path)
+        if cached is not None and cached[:3] == (stat.st_size, stat.st_mtime_ns, versions):
+            return cached[3]
+
+        current = dict(versions)
+
+        def versioned(match):
+            quote, name = match.groups()
+            if current.get(name) is None:
+                return match.group(0)
+            return f"{quote}{name}?v={current[name]}{quote}"
+
+        body = _REFERENCE_PATTERN.sub(versioned, text).encode('utf-8')
+        asset = StaticAsset(body, source.content_type, source.mtime)
+        with self._lock:
+            self._pages[path] = (stat.st_size, stat.st_mtime_ns, versions, asset)
+        return asset
+
+    def get(self, path):
+        """StaticAsset of a file path (HTML with versioned references), or None if it is not served."""
+        path = os.path.abspath(path)
+        if not self.serves(path):
+            return None
+        if path.endswith(('.html', '.htm')):
+            return self._page(path)
+        return self._load(path)
+
+    def warm(self):
+        """Load (and compress) the pages and versioned files of the directory; returns how many."""
+        count = 0
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(VERSIONED_EXTENSIONS + ('.html',)) and self.get(os.path.join(self.directory, name)):
+                count += 1
+        return count
@@ -0,0 +1,105 @@
+"""
+Shared fixtures of the tests: the scripts import each other as top-level
+modules, so the repository root goes on sys.path, and `serve` runs a local
+HTTP server (an http.server handler class) on an ephemeral port.
+StubOpenAIHandler stands in for the chat.completions and responses endpoints.
+"""
+
+import hashlib
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class QuietHandler(http.server.BaseHTTPRequestHandler):
+    """Request handler that does not log every request to stderr."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+
+class StubOpenAIHandler(QuietHandler):
+    """Answers chat.completions and responses calls; the answers (and how long they take) follow from the request."""
+
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if self.path == '/v1/chat/completions':
+                key = _digest(request['messages'][-1]['content'])
+                body = self.chat_completion(key)
+            else:
+                key = _digest(request['input'] if isinstance(request['input'], str) else json.dumps(request['input']))
+                body = self.response(key)
+            # Up to 40 ms, so turns submitted later often finish first
+            time.sleep(int(key[:2], 16) % 5 * 0.01)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def chat_completion(key):
+        return {
+            'id': f'chatcmpl-{key}', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o',
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': f'Advice {key}'}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+        }
+
+    @staticmethod
+    def response(key):
+        urls = [f'https://site{i}.example.org/{key}' for i in range(3)]
+        return {
+            'id': f'resp_{key}', 'object': 'response', 'created_at': 0, 'model': 'gpt-4o',
+            'status': 'completed', 'parallel_tool_calls': True, 'tool_choice': 'auto', 'tools': [],
+            'output': [{'type': 'message', 'id': f'msg_{key}', 'status': 'completed', 'role': 'assistant',
+                        'content': [{'type': 'output_text', 'text': 'References',
+                                     'annotations': [{'type': 'url_citation', 'url': url, 'title': url,
+                                                      'start_index': 0, 'end_index': 1} for url in urls]}]}],
+            'usage': {'input_tokens': 20, 'output_tokens': 10, 'total_tokens': 30,
+                      'input_tokens_details': {'cached_tokens': 0}, 'output_tokens_details': {'reasoning_tokens': 0}},
+        }
+
+
+
+@pytest.fixture
+def serve():
+    """Start a server for a handler class; returns its base URL (http://127.0.0.1:<port>)."""
+    servers = []
+
+    def start(handler_class):
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
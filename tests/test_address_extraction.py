@@ -0,0 +1,37 @@
+"""
+Golden corpus of address extraction: the saved pages in golden/pages and the
+output of each region's extract_addresses_from_text on their text, recorded in
+golden/addresses.json with the per-region functions from before the shared
+regex bank, so the precompiled patterns are held to the same results.
+"""
+
+import json
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from region_engine import get_region
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+with open(os.path.join(GOLDEN_DIR, 'addresses.json'), 'r', encoding='utf-8') as f:
+    EXPECTED = json.load(f)
+
+
+def page_text(name):
+    with open(os.path.join(GOLDEN_DIR, 'pages', name), 'rb') as f:
+        return BeautifulSoup(f.read(), 'html.parser').get_text()
+
+
+@pytest.mark.parametrize('page, region', [(page, region) for page, regions in EXPECTED.items()
+                                          for region in regions])
+def test_addresses_match_golden_output(page, region):
+    addresses, address_with_countries = get_region(region).extract_addresses_from_text(page_text(page))
+
+    assert addresses == EXPECTED[page][region]['addresses']
+    assert [list(pair) for pair in address_with_countries] == EXPECTED[page][region]['address_with_countries']
+
+
+def test_every_saved_page_has_expected_output():
+    assert sorted(EXPECTED) == sorted(os.listdir(os.path.join(GOLDEN_DIR, 'pages')))
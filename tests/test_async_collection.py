@@ -0,0 +1,49 @@
+"""
+--async collection of two regions at once against a stub OpenAI server:
+inside shared_async_collection() the regions' threads hand their sessions
+to one event loop, so their requests are in flight together under one
+concurrency limit, and each region still gets its own sessions in order.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import filipino_main_therapy_bias as filipino
+import indian_main_therapy_bias as indian
+from async_collection import collect_sessions_async, shared_async_collection
+from conftest import StubOpenAIHandler
+from openai_limits import RateLimiter
+
+HISTORY = [{'question': 'How do I talk to my family?', 'advice': 'Start small.'}]
+
+
+@pytest.fixture
+def limiter(serve, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_MODE', 'bypass')
+    monkeypatch.setenv('OPENAI_BASE_URL', serve(StubOpenAIHandler) + '/v1')
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    StubOpenAIHandler.max_in_flight = 0
+    return RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+
+def collect(region, limiter=None, max_concurrency=None):
+    return collect_sessions_async(region.TURNS, HISTORY, 2, region.build_advice_request,
+                                  region.build_search_request, region.extract_urls_from_response,
+                                  max_concurrency=max_concurrency, limiter=limiter)
+
+
+def test_regions_share_one_collector(limiter):
+    serial = [collect(region, limiter, max_concurrency=1) for region in (indian, filipino)]
+    assert StubOpenAIHandler.max_in_flight == 1
+
+    with shared_async_collection(max_concurrency=2, limiter=limiter):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            shared = list(executor.map(collect, (indian, filipino)))
+
+    # Two regions with two sessions each, yet never more than the one limit in flight
+    assert StubOpenAIHandler.max_in_flight == 2
+    assert shared == serial
+    for region, urls_per_turn in zip((indian, filipino), shared):
+        assert [turn['turn_number'] for turn in urls_per_turn] == list(range(1, len(region.TURNS) + 1)) * 2
+        assert all(len(turn['urls']) == 3 for turn in urls_per_turn)
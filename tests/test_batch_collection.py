@@ -0,0 +1,186 @@
+"""
+--batch collection against a stub of the OpenAI files and batches endpoints:
+a run interrupted while its batch is still running, a resumed run whose
+stage partly fails, and the run that retries the failed turn.
+"""
+
+import email.parser
+import itertools
+import json
+import os
+
+import pytest
+from openai import InternalServerError, OpenAI
+
+import Indian_therapy_bias_demo as demo
+import indian_main_therapy_bias as main_script
+from batch_collection import BatchCollector, collect_sessions_in_batches, finish_batch_run
+from conftest import QuietHandler
+
+TURNS = main_script.TURNS[:2]
+HISTORY = [{'question': 'How do I talk to my family?', 'advice': 'Start small.'}]
+
+# Polls a batch stays in_progress before it completes
+RUNNING_POLLS = 2
+
+
+class StubBatchHandler(QuietHandler):
+    """Files and batches endpoints of the OpenAI API, with batches that run, fail requests and break on demand.
+
+    Its `state` dict steers it: while `interrupted` is set, polling a batch
+    answers 500; a custom_id in `fail_times` gets a failed result that many
+    times before it succeeds.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def send_json(self, data, status=200):
+        body = data if isinstance(data, bytes) else json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers['Content-Length']))
+        if self.path == '/v1/files':
+            message = email.parser.BytesParser().parsebytes(
+                b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + raw)
+            content = next(part.get_payload(decode=True) for part in message.get_payload()
+                           if part.get_param('name', header='content-disposition') == 'file')
+            file_id = f"file-{next(self.state['ids'])}"
+            self.state['files'][file_id] = content
+            return self.send_json({'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': 0,
+                                   'filename': 'input.jsonl', 'purpose': 'batch', 'status': 'processed'})
+        if self.path == '/v1/batches':
+            request = json.loads(raw)
+            batch_id = f"batch_{next(self.state['ids'])}"
+            lines = self.state['files'][request['input_file_id']].decode('utf-8').splitlines()
+            self.state['batches'][batch_id] = {
+                'id': batch_id, 'object': 'batch', 'endpoint': request['endpoint'],
+                'input_file_id': request['input_file_id'], 'completion_window': '24h',
+                'status': 'in_progress', 'created_at': 0, 'output_file_id': None, 'error_file_id': None,
+                'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0},
+            }
+            self.state['submitted'].append((request['endpoint'], [json.loads(line)['custom_id'] for line in lines]))
+            self.state['polls'][batch_id] = 0
+            return self.send_json(self.state['batches'][batch_id])
+        self.send_json({'error': {'message': 'not found'}}, 404)
+
+    def do_GET(self):
+        if self.path.startswith('/v1/files/') and self.path.endswith('/content'):
+            return self.send_json(self.state['files'][self.path.split('/')[3]])
+        if self.path.startswith('/v1/batches/'):
+            if self.state['interrupted']:
+                return self.send_json({'error': {'message': 'interrupted'}}, 500)
+            batch = self.state['batches'][self.path.rsplit('/', 1)[1]]
+            self.state['polls'][batch['id']] += 1
+            if batch['status'] == 'in_progress' and self.state['polls'][batch['id']] > RUNNING_POLLS:
+                self.complete(batch)
+            return self.send_json(batch)
+        self.send_json({'error': {'message': 'not found'}}, 404)
+
+    def complete(self, batch):
+        output = []
+        for line in self.state['files'][batch['input_file_id']].decode('utf-8').splitlines():
+            request = json.loads(line)
+            custom_id = request['custom_id']
+            if self.state['fail_times'].get(custom_id):
+                self.state['fail_times'][custom_id] -= 1
+                response = {'status_code': 500, 'request_id': 'req', 'body': {'error': {'message': 'failed'}}}
+            elif batch['endpoint'] == '/v1/chat/completions':
+                response = {'status_code': 200, 'request_id': 'req', 'body': {
+                    'id': 'chatcmpl', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o',
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': f'Advice {custom_id}'}}],
+                    'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}}}
+            else:
+                urls = [f'https://site{i}.example.org/{custom_id}' for i in range(3)]
+                response = {'status_code': 200, 'request_id': 'req', 'body': {
+                    'id': 'resp', 'object': 'response', 'created_at': 0, 'model': 'gpt-4o', 'status': 'completed',
+                    'parallel_tool_calls': True, 'tool_choice': 'auto', 'tools': [],
+                    'output': [{'type': 'message', 'id': 'msg', 'status': 'completed', 'role': 'assistant',
+                                'content': [{'type': 'output_text', 'text': 'References',
+                                             'annotations': [{'type': 'url_citation', 'url': url, 'title': url,
+                                                              'start_index': 0, 'end_index': 1}
+                                                             for url in urls]}]}],
+                    'usage': {'input_tokens': 20, 'output_tokens': 10, 'total_tokens': 30}}}
+            output.append({'id': f'batch_req_{custom_id}', 'custom_id': custom_id, 'response': response,
+                           'error': None})
+        output_file_id = f"file-{next(self.state['ids'])}"
+        self.state['files'][output_file_id] = '\n'.join(json.dumps(record) for record in output).encode('utf-8')
+        failed = sum(1 for record in output if record['response']['status_code'] != 200)
+        batch.update(status='completed', output_file_id=output_file_id,
+                     request_counts={'total': len(output), 'completed': len(output) - failed, 'failed': failed})
+
+
+@pytest.fixture
+def stub(serve):
+    state = {'ids': itertools.count(1), 'files': {}, 'batches': {}, 'polls': {}, 'submitted': [],
+             'interrupted': False, 'fail_times': {}}
+    base_url = serve(type('Handler', (StubBatchHandler,), {'state': state}))
+    return state, OpenAI(base_url=base_url + '/v1', api_key='test', max_retries=0)
+
+
+def collect(client, work_dir, history=HISTORY):
+    collector = BatchCollector(client, str(work_dir), poll_interval=0.01)
+    return collect_sessions_in_batches(collector, TURNS, history, 2, demo.build_advice_request,
+                                       demo.build_search_request, demo.extract_urls_from_response)
+
+
+def read_state(work_dir):
+    with open(os.path.join(work_dir, 'state.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_interrupted_run_resumes_and_retries_failed_turns(stub, tmp_path):
+    state, client = stub
+    work_dir = tmp_path / 'indian'
+    custom_ids = ['s2-t1', 's2-t2', 's3-t1', 's3-t2']
+    # The advice of s2-t2 fails in the resumed batch and in its retry
+    state['fail_times'] = {'s2-t2': 2}
+
+    # Run 1 stops while its advice batch is running
+    state['interrupted'] = True
+    with pytest.raises(InternalServerError):
+        collect(client, work_dir)
+    assert state['submitted'] == [('/v1/chat/completions', custom_ids)]
+    [open_batch] = read_state(work_dir)['advice']
+    assert state['batches'][open_batch['batch_id']]['status'] == 'in_progress'
+
+    # Run 2 polls that batch instead of resubmitting it; s2-t2 fails twice and is left without results
+    state['interrupted'] = False
+    urls_per_turn = collect(client, work_dir)
+    assert state['submitted'][1:] == [('/v1/chat/completions', ['s2-t2']),
+                                      ('/v1/responses', ['s2-t1', 's3-t1', 's3-t2'])]
+    assert [turn['turn_number'] for turn in urls_per_turn] == [1, 2, 1, 2]
+    assert urls_per_turn[1]['urls'] == []
+    for index in (0, 2, 3):
+        assert urls_per_turn[index]['urls'] == [f'https://site{i}.example.org/{custom_ids[index]}' for i in range(3)]
+    assert read_state(work_dir) == {'complete': False}
+    assert not finish_batch_run(str(work_dir))
+
+    # Run 3 only sends the failed turn again
+    urls_per_turn = collect(client, work_dir)
+    assert state['submitted'][3:] == [('/v1/chat/completions', ['s2-t2']), ('/v1/responses', ['s2-t2'])]
+    assert urls_per_turn[1]['urls'] == [f'https://site{i}.example.org/s2-t2' for i in range(3)]
+    assert all(turn['urls'] for turn in urls_per_turn)
+    assert read_state(work_dir) == {'complete': True}
+    assert finish_batch_run(str(work_dir))
+    assert not work_dir.exists()
+
+
+def test_results_of_other_requests_are_not_reused(stub, tmp_path):
+    state, client = stub
+    work_dir = tmp_path / 'indian'
+    collect(client, work_dir)
+    submitted = len(state['submitted'])
+
+    # Same custom_ids, but the batch sessions are asked against another first session
+    urls_per_turn = collect(client, work_dir, [{'question': 'Should I move out?', 'advice': 'Talk it through.'}])
+
+    assert [endpoint for endpoint, _ in state['submitted'][submitted:]] == ['/v1/chat/completions', '/v1/responses']
+    assert all(len(ids) == 4 for _, ids in state['submitted'][submitted:])
+    assert all(turn['urls'] for turn in urls_per_turn)
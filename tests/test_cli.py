@@ -0,0 +1,51 @@
+"""
+cli.run_regions: the regions run on threads of one process, sharing the
+OpenAI rate limiter and the page fetcher, with every output line (of worker
+threads too) prefixed by its region.
+"""
+
+import sys
+import types
+
+import cli
+import http_fetcher
+import openai_limits
+from session_runner import run_sessions_concurrently
+
+
+def fake_region(name, seen):
+    """Region module whose main prints from its own thread pool and records the shared objects it gets."""
+    module = types.ModuleType(name)
+    module.parse_args = lambda argv: argv
+
+    def main(args):
+        seen[name] = (openai_limits.get_default_limiter(), http_fetcher.get_default_fetcher())
+        print(f"starting {args}")
+        run_sessions_concurrently(lambda session, turn_number, question: [question], ['a', 'b'], 2, max_workers=2)
+        if name == 'region_fails':
+            raise RuntimeError('broken')
+
+    module.main = main
+    return module
+
+
+def test_regions_share_limits_and_prefix_their_output(monkeypatch, capsys):
+    seen = {}
+    regions = {'one': 'region_one', 'two': 'region_two', 'three': 'region_fails'}
+    monkeypatch.setattr(cli, 'REGION_TO_MODULE', regions)
+    for module in regions.values():
+        monkeypatch.setitem(sys.modules, module, fake_region(module, seen))
+
+    code = cli.run_regions(list(regions), sessions=3)
+
+    assert code == 1
+    assert len({limiter for limiter, _ in seen.values()}) == 1
+    assert len({fetcher for _, fetcher in seen.values()}) == 1
+    out, err = capsys.readouterr()
+    for region in ('one', 'two', 'three'):
+        assert f"[{region}] starting ['--sessions', '3']\n" in out
+        # Printed by session_runner's worker threads
+        assert f"[{region}]   [4/4] Session " in out
+    assert "  three: ❌ failed (exit code 1)" in out
+    assert "[three] RuntimeError: broken" in err
+    assert not isinstance(sys.stdout, cli.PrefixedOutput)
@@ -0,0 +1,24 @@
+"""
+Indian_url_analyzer.detect_cultural_context keeps the return order it had
+before the region engine: keywords first, then the concepts they matched.
+"""
+
+import Indian_url_analyzer
+
+TEXT = 'In a joint family, elders decide; a therapist may charge rupees and talk about boundaries.'
+
+
+def test_keywords_come_before_concepts():
+    category, matched_keywords, matched_concepts, unique_concept_count, western_keywords = \
+        Indian_url_analyzer.detect_cultural_context(None, TEXT)
+
+    assert isinstance(matched_keywords, list) and isinstance(matched_concepts, dict)
+    assert set(matched_concepts) == {'joint_family', 'rupees'}
+    assert 'joint family' in matched_keywords and 'rupees' in matched_keywords
+    assert unique_concept_count == 2
+    assert western_keywords == ['boundaries']
+    assert category == Indian_url_analyzer.ENGINE.detect_cultural_context(None, TEXT)[0]
+
+
+def test_empty_page_is_not_related():
+    assert Indian_url_analyzer.detect_cultural_context(None, '') == ('not_related', [], {}, 0, [])
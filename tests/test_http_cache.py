@@ -0,0 +1,122 @@
+"""
+ResponseCache and cached_get against a local server: hits, TTL expiry, LRU
+eviction by size and 304 revalidation once per run.
+"""
+
+import time
+
+import pytest
+
+import http_cache
+from conftest import QuietHandler
+from http_cache import ResponseCache, cached_get
+from http_fetcher import PooledFetcher
+
+PAGE_SIZE = 1000
+
+
+class PageHandler(QuietHandler):
+    """Serves PAGE_SIZE-byte pages; /etag/* pages carry an ETag and answer If-None-Match with 304."""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get('If-None-Match')))
+        etag = f'"{self.path}"' if self.path.startswith('/etag/') else None
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = self.path.encode('utf-8').ljust(PAGE_SIZE, b'.')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def base_url(serve, monkeypatch):
+    PageHandler.requests = []
+    fetcher = PooledFetcher(max_retries=0)
+    monkeypatch.setattr(http_cache, 'get_default_fetcher', lambda: fetcher)
+    yield serve(PageHandler)
+    fetcher.close()
+
+
+def downloads(path):
+    return [request for request in PageHandler.requests if request[0] == path]
+
+
+def test_second_get_is_a_hit(base_url, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    first = cached_get(base_url + '/page', cache=cache)
+    second = cached_get(base_url + '/page', cache=cache)
+
+    assert first.status_code == second.status_code == 200
+    assert second.from_cache and second.content == first.content
+    assert len(downloads('/page')) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entry_is_downloaded_again(base_url, tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=0.05)
+    cached_get(base_url + '/page', cache=cache)
+    assert cached_get(base_url + '/page', cache=cache).from_cache
+
+    time.sleep(0.1)
+    response = cached_get(base_url + '/page', cache=cache)
+
+    assert not getattr(response, 'from_cache', False)
+    assert downloads('/page') == [('/page', None), ('/page', None)]
+
+
+def test_least_recently_used_entry_is_evicted(base_url, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cached_get(base_url + '/a', cache=cache)
+    # Room for two pages with their entries, not three
+    cache.max_bytes = int(2.5 * cache.current_size())
+    time.sleep(0.02)
+    cached_get(base_url + '/b', cache=cache)
+    time.sleep(0.02)
+    assert cached_get(base_url + '/a', cache=cache).from_cache  # /b is now the least recently used
+    time.sleep(0.02)
+    cached_get(base_url + '/c', cache=cache)
+
+    assert cache.current_size() <= cache.max_bytes
+    assert cache.get(base_url + '/a') is not None
+    assert cache.get(base_url + '/b') is None
+    assert cache.get(base_url + '/c') is not None
+    cached_get(base_url + '/b', cache=cache)
+    assert len(downloads('/b')) == 2
+
+
+def test_entry_with_etag_is_revalidated_once_per_run(base_url, tmp_path, monkeypatch):
+    monkeypatch.delenv('URL_REVALIDATE', raising=False)
+    first_run = ResponseCache(str(tmp_path))
+    first = cached_get(base_url + '/etag/page', cache=first_run)
+    assert cached_get(base_url + '/etag/page', cache=first_run).from_cache
+
+    # The next run asks whether the page changed, though the entry has not expired
+    cache = ResponseCache(str(tmp_path))
+    response = cached_get(base_url + '/etag/page', cache=cache)
+
+    assert response.revalidated and response.content == first.content
+    assert downloads('/etag/page') == [('/etag/page', None), ('/etag/page', '"/etag/page"')]
+    assert cache.revalidations == 1
+    # Once per run
+    assert cached_get(base_url + '/etag/page', cache=cache).from_cache
+    assert len(downloads('/etag/page')) == 2
+
+
+def test_entries_are_used_until_they_expire_without_revalidation(base_url, tmp_path, monkeypatch):
+    monkeypatch.setenv('URL_REVALIDATE', '0')
+    cached_get(base_url + '/etag/page', cache=ResponseCache(str(tmp_path)))
+
+    assert cached_get(base_url + '/etag/page', cache=ResponseCache(str(tmp_path))).from_cache
+    assert len(downloads('/etag/page')) == 1
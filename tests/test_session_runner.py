@@ -0,0 +1,44 @@
+"""
+--sessions N extra sessions against a stub OpenAI server: with several
+workers the turns finish out of order, but urls_per_turn comes back in the
+order of the serial loop.
+"""
+
+import pytest
+from openai import OpenAI
+
+import indian_main_therapy_bias as main_script
+from checkpoint_journal import CheckpointJournal
+from conftest import StubOpenAIHandler
+from conversation_state import ConversationState
+from openai_limits import LimitedClient, RateLimiter
+
+
+@pytest.fixture
+def client(serve, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_MODE', 'bypass')
+    StubOpenAIHandler.max_in_flight = 0
+    base_url = serve(StubOpenAIHandler)
+    return LimitedClient(OpenAI(base_url=base_url + '/v1', api_key='test', max_retries=0),
+                         limiter=RateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+
+def run_sessions(client, num_sessions, max_workers):
+    history = ConversationState([{'question': 'How do I talk to my family?', 'advice': 'Start small.'}])
+    journal = CheckpointJournal(None, ['session', 'turn_number'])
+    return main_script.run_extra_sessions(client, history, journal, num_sessions, max_workers=max_workers)
+
+
+def test_concurrent_sessions_keep_the_serial_order(client):
+    serial = run_sessions(client, 3, max_workers=1)
+    assert StubOpenAIHandler.max_in_flight == 1
+
+    concurrent = run_sessions(client, 3, max_workers=4)
+
+    assert StubOpenAIHandler.max_in_flight > 1
+    assert concurrent == serial
+    assert [turn['turn_number'] for turn in concurrent] == list(range(1, len(main_script.TURNS) + 1)) * 3
+    # Each turn asks another question, so every turn of a session has its own URLs
+    first_session = [tuple(turn['urls']) for turn in concurrent[:len(main_script.TURNS)]]
+    assert len(set(first_session)) == len(main_script.TURNS)
+    assert all(len(turn['urls']) == 3 for turn in concurrent)
@@ -0,0 +1,76 @@
+"""
+The visualization server on a scratch directory: only the page, results
+files, payload and icons are served, and the JSON API answers HEAD too.
+"""
+
+import functools
+import json
+import os
+
+import pytest
+import requests
+
+from results_index import ResultsIndex
+from start_server_fixs import PAGE, MyHTTPRequestHandler
+from static_assets import AssetStore
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def server(serve, tmp_path):
+    directory = str(tmp_path)
+    write(os.path.join(directory, PAGE), "<html><img src='greyspace.png'></html>")
+    write(os.path.join(directory, 'greyspace.png'), 'png')
+    write(os.path.join(directory, 'indian_therapy_bias_results.json'), json.dumps({
+        'first_conversation': [], 'url_analysis': [],
+        'url_collection_summary': {'urls_by_turn': {}},
+    }))
+    write(os.path.join(directory, '.env'), 'OPENAI_API_KEY=secret')
+    write(os.path.join(directory, '.url_cache', 'entries', 'a.json'), '{}')
+    write(os.path.join(directory, 'batch_runs', 'indian', 'state.json'), '{}')
+    write(os.path.join(directory, 'start_server_fixs.py'), '')
+    quiet = type('Handler', (MyHTTPRequestHandler,), {'log_message': lambda self, format, *args: None})
+    handler = functools.partial(quiet, directory=directory, assets=AssetStore(directory),
+                                results=ResultsIndex(directory))
+    return serve(handler)
+
+
+@pytest.mark.parametrize('path', ['/' + PAGE, '/greyspace.png', '/indian_therapy_bias_results.json',
+                                  '/visualization_data.json'])
+def test_allowed_files_are_served(server, path):
+    assert requests.get(server + path).status_code == 200
+
+
+@pytest.mark.parametrize('path', ['/.env', '/.url_cache/entries/a.json', '/.url_cache/', '/batch_runs/indian/state.json',
+                                  '/batch_runs/', '/start_server_fixs.py', '/%2eenv', '/greyspace.png/..%2f.env'])
+def test_everything_else_is_not_found(server, path):
+    response = requests.get(server + path, allow_redirects=False)
+    assert response.status_code == 404
+    assert b'secret' not in response.content
+
+
+def test_root_redirects_to_the_page(server):
+    response = requests.get(server + '/', allow_redirects=False)
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/' + PAGE
+
+
+def test_api_answers_head_like_get(server):
+    get = requests.get(server + '/api/regions')
+    head = requests.head(server + '/api/regions')
+
+    assert head.status_code == get.status_code == 200
+    assert head.headers['ETag'] == get.headers['ETag']
+    assert head.content == b''
+    assert [region['region'] for region in get.json()['regions']] == ['indian']
+
+
+def test_unparsable_results_file_is_503(server, tmp_path):
+    write(os.path.join(str(tmp_path), 'filipino_therapy_bias_results.json'), '{"url_analysis": [')
+    assert requests.get(server + '/api/region/filipino/summary').status_code == 503
+    assert requests.get(server + '/api/region/indian/summary').status_code == 200
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Timing Spans
+Where a region run spends its time. Named spans are timed into the recorder
+of the turn or URL being processed (recording()), so the threads of the URL
+analysis and the tasks of the async collector each time their own work:
+
+    with recording() as timings:
+        with span('page_fetch'):
+            ...
+    timings.to_json()   # {'page_fetch': {'ms': 812.4, 'calls': 1}}
+
+span() also works as a decorator, and does nothing outside recording().
+Spans nest, so their times overlap (e.g. info_page_fetch is part of
+info_pages, which is part of page_content). A span entered several times
+for one URL adds up its calls.
+
+Spans of a turn:
+    turn                The whole turn (process_turn)
+    advice              The chat completion asking for advice
+    search              The web search for references
+Spans of a URL:
+    analyze_url         The whole analysis of the URL
+    page_fetch          Download of the page
+    parse               HTML parsing (cited page and info pages)
+    page_content        Location detection from the page content
+    info_pages          About/contact/terms pages of the site (once per site)
+    info_page_fetch     Download of one of those pages
+    address_extraction  Address extraction from page text
+    keyword_matching    Cultural context detection (keyword scan)
+
+The "timings" block of the results JSON (timings_block()):
+    spans   {span: {samples, total_ms, mean_ms, p50_ms, p95_ms, max_ms,
+            histogram}} over the turns and URLs, where a sample is the time of
+            the span in one turn or URL, and histogram counts samples per
+            HISTOGRAM_BUCKETS range
+    turns   [{session, turn_number, <span>: {ms, calls}}]
+    urls    [{url, <span>: {ms, calls}}]
+"""
+
+import contextlib
+import contextvars
+import time
+
+# Upper bounds (ms) of the histogram buckets; the last bucket has none
+HISTOGRAM_BUCKETS = (10, 100, 1000, 10000)
+
+_current = contextvars.ContextVar('timing_spans', default=None)
+
+
+class Timings:
+    """Total time and number of calls of each span of one turn or URL."""
+
+    def __init__(self):
+        self.spans = {}
+
+    def add(self, name, seconds):
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def to_json(self):
+        """{span: {ms, calls}}."""
+        return {name: {'ms': round(seconds * 1000, 2), 'calls': calls}
+                for name, (seconds, calls) in self.spans.items()}
+
+
+@contextlib.contextmanager
+def recording():
+    """Time the spans entered inside this block (thread or task) into a new Timings, which is yielded."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time this block (or decorated function) as span `name` of the current recording."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def _bucket_label(index):
+    if index == 0:
+        return f"<{HISTOGRAM_BUCKETS[0]}ms"
+    if index == len(HISTOGRAM_BUCKETS):
+        return f">={HISTOGRAM_BUCKETS[-1]}ms"
+    return f"<{HISTOGRAM_BUCKETS[index]}ms"
+
+
+BUCKET_LABELS = [_bucket_label(i) for i in range(len(HISTOGRAM_BUCKETS) + 1)]
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def span_statistics(records):
+    """{span: {samples, total_ms, mean_ms, p50_ms, p95_ms, max_ms, histogram}} of {span: {ms, calls}} records."""
+    samples = {}
+    for record in records:
+        for name, entry in record.items():
+            if isinstance(entry, dict):
+                samples.setdefault(name, []).append(entry['ms'])
+
+    statistics = {}
+    for name, values in samples.items():
+        ordered = sorted(values)
+        histogram = dict.fromkeys(BUCKET_LABELS, 0)
+        for value in ordered:
+            index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS) if value < bound), len(HISTOGRAM_BUCKETS))
+            histogram[BUCKET_LABELS[index]] += 1
+        total = sum(ordered)
+        statistics[name] = {
+            'samples': len(ordered),
+            'total_ms': round(total, 2),
+            'mean_ms': round(total / len(ordered), 2),
+            'p50_ms': _percentile(ordered, 0.5),
+            'p95_ms': _percentile(ordered, 0.95),
+            'max_ms': ordered[-1],
+            'histogram': histogram,
+        }
+    return statistics
+
+
+def timings_block(turns, urls):
+    """The "timings" block of the results JSON (see the module docstring)."""
+    return {
+        'spans': span_statistics(turns + urls),
+        'turns': turns,
+        'urls': urls,
+    }
+
+
+def print_timings(timings):
+    """Print the span statistics of a timings block, with a histogram of every span."""
+    spans = timings.get('spans', {})
+    if not spans:
+        return
+    print("\nTimings (per turn / per URL):")
+    width = max(len(name) for name in spans)
+    print(f"  {'span':<{width}}  {'samples':>7}  {'total s':>8}  {'mean ms':>9}  {'p95 ms':>9}  "
+          + "  ".join(f"{label:>8}" for label in BUCKET_LABELS))
+    for name, entry in sorted(spans.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+        print(f"  {name:<{width}}  {entry['samples']:>7}  {entry['total_ms'] / 1000:>8.1f}  "
+              f"{entry['mean_ms']:>9.1f}  {entry['p95_ms']:>9.1f}  "
+              + "  ".join(f"{entry['histogram'][label]:>8}" for label in BUCKET_LABELS))
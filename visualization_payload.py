@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Visualization Payload
+Builds visualization_data.json, the aggregates epistemic_violence_visualization.html
+draws its map and Part 2 columns from, out of the three regions' results
+files. The page renders from this small file right away and only fetches the
+full results files (transcripts, URL metadata) when Part 3 scrolls into view.
+
+Per context (india, nigeria, philippines):
+    total_urls         Number of URLs analyzed
+    countries          [[country, count], ...] for the map, in order of first appearance
+    categories         [[cultural_context, count], ...] of the four relevance
+                       categories, most frequent first; the rest is "unknown"
+    western_keywords   Top 10 [[keyword, count], ...] (Part 2, category B)
+    concepts           Concept trees (category C): [{concept, url_count,
+                       keywords: top 5 [[keyword, count], ...]}] for the
+                       concepts with at least one URL
+Percentages are count / total_urls (count / url_count in concept trees).
+
+Usage:
+    python visualization_payload.py
+The visualization server (start_server_fixs.py) rebuilds the file on start,
+and again when a results file changes while it is running.
+"""
+
+import json
+import os
+import tempfile
+
+from results_summary import RESULTS_FILES, ResultColumns, load_results
+
+PAYLOAD_FILE = 'visualization_data.json'
+
+# Visualization context of each region's results
+CONTEXT_REGIONS = {
+    'india': 'indian',
+    'nigeria': 'nigerian',
+    'philippines': 'filipino',
+}
+
+# Relevance categories shown in Part 2 (category A)
+CATEGORIES = ('addresses_user_dilemma', 'defines_practice', 'generic_advice', 'not_related')
+
+# Concept trees of category C: (concept shown, matched concepts it covers)
+CONTEXT_CONCEPTS = {
+    'india': [
+        ('joint_family', ['joint_family']),
+        ('seeking_approval', ['seeking_approval']),
+        ('rupees', ['rupees']),
+    ],
+    'nigeria': [
+        ('owambe', ['owambe', 'naira', 'spraying_money']),
+        ('family_obligations', ['family_obligations']),
+        ('elder_care', ['elder_care']),
+    ],
+    'philippines': [
+        ('pamanhikan', ['pamanhikan']),
+        ('living_with_family', ['living_with_family']),
+        ('preparing_for_baby', ['preparing_for_baby']),
+    ],
+}
+
+# Keywords left out of a concept tree, e.g. the financial ones under India's joint family
+EXCLUDED_CONCEPT_KEYWORDS = {
+    ('india', 'joint_family'): {'Financial Planning', 'Savings', 'financial independence', 'financial goals',
+                                'budget'},
+}
+
+TOP_KEYWORDS = 10
+TOP_CONCEPT_KEYWORDS = 5
+
+
+def _top(counts, limit):
+    """[[value, count], ...] of the `limit` most frequent values (ties keep their order)."""
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return [[value, count] for value, count in ranked[:limit]]
+
+
+def context_payload(context, results):
+    """Aggregates of one context's url_analysis list."""
+    columns = ResultColumns(results)
+
+    categories = {category: count for category, count in columns.counts('cultural_context').items()
+                  if category in CATEGORIES}
+
+    concepts = []
+    for concept, matched_concepts in CONTEXT_CONCEPTS[context]:
+        url_count, keyword_counts = columns.keyword_counts_for(matched_concepts)
+        if not url_count:
+            continue
+        excluded = EXCLUDED_CONCEPT_KEYWORDS.get((context, concept), set())
+        keyword_counts = {keyword: count for keyword, count in keyword_counts.items() if keyword not in excluded}
+        concepts.append({
+            'concept': concept,
+            'url_count': url_count,
+            'keywords': _top(keyword_counts, TOP_CONCEPT_KEYWORDS),
+        })
+
+    return {
+        'total_urls': columns.size,
+        'countries': [[country, count] for country, count in columns.counts('country').items()],
+        'categories': _top(categories, len(CATEGORIES)),
+        'western_keywords': _top(columns.counts('western_keywords'), TOP_KEYWORDS),
+        'concepts': concepts,
+    }
+
+
+def build_payload(directory=None, output_file=PAYLOAD_FILE):
+    """Write the payload of the results files in `directory` (default: this script's) and return it.
+
+    Contexts whose results file does not exist yet are left out. Raises
+    ValueError if a results file is not valid JSON (e.g. half-written by an
+    older run); the payload file is then left as it was.
+    """
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    paths = {context: os.path.join(directory, RESULTS_FILES[region])
+             for context, region in CONTEXT_REGIONS.items()}
+    loaded = load_results([path for path in paths.values() if os.path.exists(path)])
+
+    payload = {context: context_payload(context, loaded[path]['url_analysis'])
+               for context, path in paths.items() if path in loaded}
+    # Replaced at once, so the server never hands out a half-written payload
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(directory, output_file))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return payload
+
+
+def refresh_payload(directory=None, output_file=PAYLOAD_FILE):
+    """Rebuild the payload if a results file changed since it was written; True if it was rebuilt.
+
+    A results file that cannot be parsed yet keeps the previous payload, and
+    is tried again on the next call.
+    """
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        built = os.path.getmtime(os.path.join(directory, output_file))
+    except OSError:
+        built = None
+    changed = [os.path.getmtime(path) for path in (os.path.join(directory, RESULTS_FILES[region])
+                                                   for region in CONTEXT_REGIONS.values()) if os.path.exists(path)]
+    if built is not None and all(mtime <= built for mtime in changed):
+        return False
+    try:
+        build_payload(directory, output_file)
+    except ValueError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    payload = build_payload()
+    print(f"Wrote {PAYLOAD_FILE} ({', '.join(payload)})")